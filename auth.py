@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import time
+import uuid
 from fastapi import Depends, HTTPException, status, Cookie
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
@@ -9,35 +10,68 @@ from database import get_db
 from models import User, UserRole
 from schemas import UserResponse
 from config import settings
+from revocation import is_revoked
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer(auto_error=False)
 
 
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    """Contexte bcrypt, importé au premier usage (passlib/bcrypt ralentissent le démarrage)"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vérifier un mot de passe"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hasher un mot de passe"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def _encode_token(claims: dict, expires_delta: timedelta) -> str:
+    from jose import jwt
+    to_encode = claims.copy()
+    to_encode.update({
+        "exp": datetime.utcnow() + expires_delta,
+        # iat en secondes fractionnaires : comparé à l'horodatage des révocations
+        "iat": time.time(),
+        "jti": uuid.uuid4().hex
+    })
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def user_claims(user: User) -> dict:
+    """Claims portés par l'access token : assez pour autoriser sans lire la base"""
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.role.value,
+        "active": user.is_active
+    }
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Créer un token JWT"""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    """Créer un access token JWT de courte durée"""
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return _encode_token({**data, "type": "access"}, expires_delta)
+
+
+def create_refresh_token(user_id: int) -> str:
+    """Créer un refresh token (sert uniquement à obtenir de nouveaux access tokens)"""
+    return _encode_token(
+        {"sub": str(user_id), "type": "refresh"},
+        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    )
 
 
 def decode_access_token(token: str) -> Optional[dict]:
     """Décoder un token JWT"""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
@@ -45,12 +79,21 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
-def get_current_user(
+class TokenUser:
+    """Utilisateur reconstruit à partir des claims de l'access token, sans accès base"""
+
+    def __init__(self, payload: dict):
+        self.id = int(payload["sub"])
+        self.email = payload.get("email")
+        self.role = UserRole(payload["role"])
+        self.is_active = bool(payload.get("active"))
+
+
+def get_token_user(
     token: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    session_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
-) -> User:
-    """Obtenir l'utilisateur actuel à partir du token"""
+    session_token: Optional[str] = Cookie(None)
+) -> TokenUser:
+    """Authentifier la requête à partir des seuls claims du token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Non authentifié",
@@ -68,17 +111,38 @@ def get_current_user(
         raise credentials_exception
     
     payload = decode_access_token(token_value)
-    if payload is None:
+    if payload is None or payload.get("type") != "access":
         raise credentials_exception
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    if payload.get("sub") is None or payload.get("role") is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    # Bloqué, supprimé, promu ou déconnecté : le token doit être renouvelé
+    if is_revoked(payload):
         raise credentials_exception
     
+    if not payload.get("active"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Compte désactivé"
+        )
+    
+    return TokenUser(payload)
+
+
+def get_current_user(
+    token_user: TokenUser = Depends(get_token_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """Obtenir l'utilisateur actuel depuis la base (pour les routes qui lisent ou modifient son profil)"""
+    user = db.query(User).filter(User.id == token_user.id).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Non authentifié",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -101,9 +165,9 @@ def get_current_active_user(
 
 
 def get_current_admin(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
-    """Obtenir un administrateur"""
+    current_user: TokenUser = Depends(get_token_user)
+) -> TokenUser:
+    """Obtenir un administrateur (rôle lu dans le token, sans accès base)"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,97 @@
+"""
+Vérification de la mémoire bornée des exports en flux (exports.py)
+Consomme stream_export pour N puis 4N logs d'activité, en CSV et en NDJSON,
+et mesure le pic mémoire (tracemalloc). L'export est borné si le pic ne
+dépend pas du nombre de lignes : le script échoue (code de sortie 1) si un
+pic dépasse --max-peak-mb, ou si le pic à 4N dépasse de plus de 50 % celui à N
+
+Usage : python benchmarks/export_memory.py [--rows 100000] [--max-peak-mb 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED_BATCH_SIZE = 10000
+
+
+def seed(db, start: int, rows: int):
+    from sqlalchemy import insert
+
+    from models import ActivityLog
+
+    for offset in range(start, start + rows, SEED_BATCH_SIZE):
+        db.execute(insert(ActivityLog), [
+            {
+                "user_id": None, "action": "login", "ip_address": "10.0.0.1",
+                "details": f"Connexion n°{i} depuis l'application mobile",
+            }
+            for i in range(offset, min(offset + SEED_BATCH_SIZE, start + rows))
+        ])
+    db.commit()
+
+
+def measure(fmt: str):
+    """Pic mémoire (octets), octets produits et durée d'un export complet"""
+    from exports import stream_export
+
+    size = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for chunk in stream_export("activity-logs", fmt):
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--max-peak-mb", type=float, default=8.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(DATABASE_URL=f"sqlite:///{tmp}/exports.db")
+        sys.path.insert(0, ROOT)
+
+        import models  # noqa: F401  Tables déclarées avant create_all
+        from database import Base, SessionLocal, engine
+
+        Base.metadata.create_all(bind=engine)
+
+        peaks = {}
+        seeded = 0
+        print(f"{'lignes':>8} {'format':<7} {'pic Mo':>8} {'Mo produits':>12} {'durée s':>8}")
+        for rows in (args.rows, 4 * args.rows):
+            db = SessionLocal()
+            seed(db, seeded, rows - seeded)
+            db.close()
+            seeded = rows
+            for fmt in ("csv", "ndjson"):
+                peak, size, elapsed = measure(fmt)
+                peaks[(rows, fmt)] = peak
+                print(f"{rows:>8} {fmt:<7} {peak / 1e6:>8.2f} {size / 1e6:>12.1f} {elapsed:>8.2f}")
+
+        failures = []
+        for fmt in ("csv", "ndjson"):
+            small, large = peaks[(args.rows, fmt)], peaks[(4 * args.rows, fmt)]
+            if max(small, large) > args.max_peak_mb * 1e6:
+                failures.append(f"{fmt} : pic de {max(small, large) / 1e6:.2f} Mo > {args.max_peak_mb} Mo")
+            if large > 1.5 * small:
+                failures.append(f"{fmt} : le pic croît avec le nombre de lignes ({small / 1e6:.2f} -> {large / 1e6:.2f} Mo)")
+
+        for failure in failures:
+            print(f"ÉCHEC {failure}")
+        if failures:
+            sys.exit(1)
+        print("Mémoire bornée : pic indépendant du nombre de lignes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark des endpoints de liste (listings.py)
+Pour chaque liste de N lignes, compare le chargement ORM (objets suivis par la
+session, relations chargées puis validées par le schéma de réponse) et la
+lecture en colonnes Core sérialisée directement (listings.json_response) :
+temps CPU (médiane), pic mémoire (tracemalloc, passe séparée), requêtes SQL
+
+Usage : python benchmarks/list_queries.py [--rows 10000] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(db, rows: int) -> int:
+    from sqlalchemy import insert, select
+
+    from models import (
+        AdminMessage, Bracket, Match, MatchStatus, RegistrationStatus, RoundType, Tournament,
+        TournamentRegistration, User, UserRole
+    )
+
+    db.execute(insert(User), [
+        {
+            "email": f"player{i}@example.com", "username": f"player{i}", "full_name": f"Joueur {i}",
+            "phone": "+2250700000000", "hashed_password": "x", "role": UserRole.PLAYER,
+            "is_active": True, "is_verified": True, "registration_status": RegistrationStatus.APPROVED,
+            "profile_picture": f"profiles/player_{i}.jpg",
+        }
+        for i in range(rows)
+    ])
+    user_ids = db.execute(select(User.id).order_by(User.id)).scalars().all()
+    tournament = Tournament(name="Benchmark", registration_fee=0, max_participants=rows)
+    db.add(tournament)
+    db.flush()
+    db.execute(insert(TournamentRegistration), [
+        {"user_id": user_id, "tournament_id": tournament.id, "status": RegistrationStatus.APPROVED}
+        for user_id in user_ids[:rows]
+    ])
+    db.execute(insert(Match), [
+        {
+            "tournament_id": tournament.id, "round_type": RoundType.ROUND_ROBIN, "round_number": i // 100 + 1,
+            "match_number": i % 100 + 1, "player1_id": user_ids[i % len(user_ids)],
+            "player2_id": user_ids[(i + 1) % len(user_ids)], "status": MatchStatus.PENDING,
+        }
+        for i in range(rows)
+    ])
+    db.execute(insert(Bracket), [
+        {
+            "tournament_id": tournament.id, "round_type": RoundType.ROUND_ROBIN, "round_number": i // 100 + 1,
+            "position": i % 100, "user_id": user_ids[i % len(user_ids)],
+        }
+        for i in range(rows)
+    ])
+    db.execute(insert(AdminMessage), [
+        {"title": f"Annonce {i}", "content": "Contenu " * 20, "is_important": i % 10 == 0, "created_by": user_ids[0]}
+        for i in range(rows)
+    ])
+    db.commit()
+    return tournament.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(DATABASE_URL=f"sqlite:///{tmp}/lists.db")
+        sys.path.insert(0, ROOT)
+
+        from typing import List
+
+        from pydantic import TypeAdapter
+        from sqlalchemy import desc, event
+
+        import listings
+        from database import Base, SessionLocal, engine
+        from models import AdminMessage, Bracket, Match, TournamentRegistration, User
+        from schemas import (
+            AdminMessageResponse, BracketResponse, MatchResponse, RegistrationResponse, UserResponse
+        )
+
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        tournament_id = seed(db, args.rows)
+        db.close()
+        rows = args.rows
+
+        # Anciennes implémentations des handlers (requête ORM, relations chargées par le schéma)
+        cases = [
+            (
+                "users", UserResponse,
+                lambda db: db.query(User).order_by(desc(User.created_at)).offset(0).limit(rows).all(),
+                lambda db: listings.list_users(db, 0, rows),
+            ),
+            (
+                "registrations", RegistrationResponse,
+                lambda db: db.query(TournamentRegistration)
+                .order_by(desc(TournamentRegistration.created_at)).offset(0).limit(rows).all(),
+                lambda db: listings.list_registrations(db, 0, rows),
+            ),
+            (
+                "matches", MatchResponse,
+                lambda db: db.query(Match).filter(Match.tournament_id == tournament_id)
+                .order_by(Match.round_number, Match.match_number).all(),
+                lambda db: listings.list_tournament_matches(db, tournament_id),
+            ),
+            (
+                "brackets", BracketResponse,
+                lambda db: db.query(Bracket).filter(Bracket.tournament_id == tournament_id)
+                .order_by(Bracket.round_number, Bracket.position).all(),
+                lambda db: listings.list_tournament_brackets(db, tournament_id),
+            ),
+            (
+                "messages", AdminMessageResponse,
+                lambda db: db.query(AdminMessage).filter(AdminMessage.is_active == True)
+                .order_by(desc(AdminMessage.is_important), desc(AdminMessage.created_at)).all(),
+                lambda db: listings.list_active_messages(db),
+            ),
+        ]
+
+        counter = [0]
+        event.listen(engine, "before_cursor_execute", lambda *_: counter.__setitem__(0, counter[0] + 1))
+
+        def run_orm(load, adapter):
+            """Ancien chemin : objets ORM validés puis sérialisés par le response_model"""
+            session = SessionLocal()
+            try:
+                return adapter.dump_json(adapter.validate_python(load(session), from_attributes=True))
+            finally:
+                session.close()
+
+        def run_core(load, adapter):
+            """Nouveau chemin : dicts de colonnes sérialisés directement (json_response)"""
+            session = SessionLocal()
+            try:
+                return listings.json_response(load(session)).body
+            finally:
+                session.close()
+
+        print(f"{rows} lignes par liste, médiane sur {args.runs} exécutions")
+        print(f"{'liste':<14} {'chemin':<5} {'CPU ms':>8} {'pic Mo':>8} {'SQL':>6} {'octets':>10}")
+        for name, schema, orm_load, core_load in cases:
+            adapter = TypeAdapter(List[schema])
+            outputs = {}
+            for label, run, load in (("orm", run_orm, orm_load), ("core", run_core, core_load)):
+                timings = []
+                for _ in range(args.runs):
+                    counter[0] = 0
+                    start = time.process_time()
+                    body = run(load, adapter)
+                    timings.append(time.process_time() - start)
+                queries = counter[0]
+                tracemalloc.start()
+                run(load, adapter)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                outputs[label] = body
+                print(
+                    f"{name:<14} {label:<5} {statistics.median(timings) * 1000:>8.0f} "
+                    f"{peak / 1e6:>8.1f} {queries:>6} {len(body):>10}"
+                )
+            if outputs["orm"] != outputs["core"]:
+                print(f"  ATTENTION : réponses différentes pour {name}")
+
+
+if __name__ == "__main__":
+    main()
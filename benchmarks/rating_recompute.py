@@ -0,0 +1,90 @@
+"""
+Benchmark du recalcul des cotes Elo
+Remplit une base SQLite neuve avec un historique synthétique de matchs joués,
+puis mesure recompute_ratings : lecture des matchs, calcul et réécriture des
+cotes. Le temps de calcul seul (compute_ratings) est mesuré à part
+
+Usage : python benchmarks/rating_recompute.py [--matches 1000000] [--players 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=2026)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/ratings.db"
+        sys.path.insert(0, ROOT)
+
+        from sqlalchemy import insert
+
+        from database import Base, SessionLocal, engine
+        from models import Match, MatchStatus, PlayerRating, RoundType, Tournament, User, UserRole
+        from ratings import compute_ratings, recompute_ratings
+
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        db.execute(insert(User), [
+            {"email": f"p{i}@example.com", "username": f"p{i}", "full_name": f"Joueur {i}",
+             "hashed_password": "x", "role": UserRole.PLAYER}
+            for i in range(args.players)
+        ])
+        tournament = Tournament(name="Historique", registration_fee=0, max_participants=args.players)
+        db.add(tournament)
+        db.flush()
+
+        rng = random.Random(args.seed)
+        origin = datetime(2020, 1, 1)
+        batch = []
+        for number in range(args.matches):
+            player1, player2 = rng.sample(range(1, args.players + 1), 2)
+            batch.append({
+                "tournament_id": tournament.id, "round_type": RoundType.SWISS, "round_number": 1,
+                "match_number": number + 1, "player1_id": player1, "player2_id": player2,
+                "player1_score": rng.randint(0, 4), "player2_score": rng.randint(0, 4),
+                "status": MatchStatus.PLAYED, "played_at": origin + timedelta(minutes=number)
+            })
+            if len(batch) == 50_000:
+                db.execute(insert(Match), batch)
+                batch = []
+        if batch:
+            db.execute(insert(Match), batch)
+        db.commit()
+
+        start = time.perf_counter()
+        players = recompute_ratings(db)
+        db.commit()
+        total = time.perf_counter() - start
+        rows = db.query(PlayerRating).count()
+        db.close()
+
+    rng = random.Random(args.seed)
+    player1, player2, results = [], [], []
+    for _ in range(args.matches):
+        a, b = rng.sample(range(args.players), 2)
+        player1.append(a)
+        player2.append(b)
+        results.append(rng.choice((0.0, 0.5, 1.0)))
+    start = time.perf_counter()
+    compute_ratings(player1, player2, results, args.players, 1500.0, 32.0)
+    compute = time.perf_counter() - start
+
+    print(f"{args.matches} matchs, {players} joueurs classés ({rows} lignes player_ratings)")
+    print(f"recompute_ratings (lecture + calcul + écriture) : {total:6.2f} s")
+    print(f"compute_ratings seul                          : {compute:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
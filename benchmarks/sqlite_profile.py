@@ -0,0 +1,127 @@
+"""
+Benchmark du profil SQLite (SQLITE_PROFILE)
+Charge mixte lecture/écriture sur une base SQLite neuve : des threads lecteurs
+lisent les matchs d'un tournoi et des profils joueurs, des threads écrivains
+enregistrent un log d'activité et un score (un commit par écriture).
+Chaque profil tourne dans un sous-processus (les pragmas sont lus à l'import)
+
+Usage : python benchmarks/sqlite_profile.py [--seconds 5] [--readers 8] [--writers 2]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ("default", "performance")
+
+
+def run_workload(seconds: float, readers: int, writers: int) -> dict:
+    """Exécuté dans le sous-processus : DATABASE_URL et SQLITE_PROFILE sont déjà définis"""
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import insert, select, update
+    from sqlalchemy.exc import OperationalError
+
+    from database import Base, SessionLocal, engine
+    from models import ActivityLog, Match, MatchStatus, RoundType, Tournament, User, UserRole
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.execute(insert(User), [
+        {"email": f"p{i}@example.com", "username": f"p{i}", "full_name": f"Joueur {i}",
+         "hashed_password": "x", "role": UserRole.PLAYER}
+        for i in range(1000)
+    ])
+    tournament = Tournament(name="Bench", registration_fee=0, max_participants=1000)
+    db.add(tournament)
+    db.flush()
+    db.execute(insert(Match), [
+        {"tournament_id": tournament.id, "round_type": RoundType.ROUND_ROBIN, "round_number": i // 50 + 1,
+         "match_number": i % 50 + 1, "player1_id": 2 * (i % 500) + 1, "player2_id": 2 * (i % 500) + 2,
+         "status": MatchStatus.PENDING}
+        for i in range(500)
+    ])
+    db.commit()
+    tournament_id = tournament.id
+    db.close()
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader():
+        session = SessionLocal()
+        while time.perf_counter() < deadline:
+            try:
+                session.execute(select(Match).where(Match.tournament_id == tournament_id)).all()
+                session.execute(select(User).where(User.id == random.randint(1, 1000))).first()
+                session.commit()
+                key = "reads"
+            except OperationalError:
+                session.rollback()
+                key = "errors"
+            with lock:
+                counts[key] += 1
+        session.close()
+
+    def writer():
+        session = SessionLocal()
+        while time.perf_counter() < deadline:
+            try:
+                session.execute(insert(ActivityLog).values(action="BENCH", details="x"))
+                session.execute(
+                    update(Match).where(Match.id == random.randint(1, 500)).values(player1_score=random.randint(0, 5))
+                )
+                session.commit()
+                key = "writes"
+            except OperationalError:
+                session.rollback()
+                key = "errors"
+            with lock:
+                counts[key] += 1
+        session.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_workload(args.seconds, args.readers, args.writers)))
+        return
+
+    print(f"{args.readers} lecteurs, {args.writers} écrivains, {args.seconds:.0f} s par profil")
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/bench.db", SQLITE_PROFILE=profile)
+            output = subprocess.check_output(
+                [sys.executable, os.path.abspath(__file__), "--child",
+                 "--seconds", str(args.seconds), "--readers", str(args.readers), "--writers", str(args.writers)],
+                cwd=ROOT, env=env, text=True
+            )
+        counts = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{profile:<12} lectures/s {counts['reads'] / args.seconds:>8.0f}   "
+            f"écritures/s {counts['writes'] / args.seconds:>7.0f}   erreurs (verrou) {counts['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark du démarrage à froid
+Mesure le temps d'import de main et le temps jusqu'à la première réponse HTTP
+(uvicorn lancé dans un sous-processus), sur une base SQLite neuve puis déjà initialisée
+
+Usage : python benchmarks/startup.py [--runs 5]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    """Temps d'import de main dans un interpréteur neuf (secondes)"""
+    output = subprocess.check_output(
+        [sys.executable, "-c", "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"],
+        cwd=ROOT, env=env, text=True
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_response(env: dict, timeout: float = 30.0) -> float:
+    """Temps entre le lancement d'uvicorn et la première réponse de / (secondes)"""
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    response.read()
+                return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Le serveur n'a pas répondu à temps")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/startup.db", UPLOAD_DIR=f"{tmp}/uploads")
+
+        imports = [measure_import(env) for _ in range(args.runs)]
+        print(f"Import de main          : médiane {statistics.median(imports) * 1000:.0f} ms")
+
+        cold = measure_first_response(env)
+        print(f"1re réponse (base neuve) : {cold * 1000:.0f} ms")
+
+        warm = [measure_first_response(env) for _ in range(args.runs)]
+        print(f"1re réponse (base prête) : médiane {statistics.median(warm) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
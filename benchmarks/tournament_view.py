@@ -0,0 +1,113 @@
+"""
+Benchmark de la page des brackets
+Compare, pour un tournoi à élimination directe de N joueurs, l'ancien chargement
+(/api/tournaments/{id} + /brackets + /matches) et l'endpoint combiné /view :
+octets transférés, nombre de requêtes SQL et temps de réponse
+
+Usage : python benchmarks/tournament_view.py [--players 256] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(client, paths, counter, runs):
+    """Octets et requêtes SQL d'un chargement, médiane du temps sur runs chargements"""
+    timings = []
+    for _ in range(runs):
+        counter[0] = 0
+        start = time.perf_counter()
+        size = sum(len(client.get(path).content) for path in paths)
+        timings.append(time.perf_counter() - start)
+    return size, counter[0], statistics.median(timings)
+
+
+def wait_for_job(client, job_id, headers, timeout=120):
+    """Attendre la fin du job de démarrage (comme waitForJob dans admin.js)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/admin/jobs/{job_id}", headers=headers).json()
+        if job["status"] == "succeeded":
+            return
+        if job["status"] == "failed":
+            raise SystemExit(f"Démarrage du tournoi en échec : {job['error']}")
+        time.sleep(0.05)
+    raise SystemExit("Démarrage du tournoi trop long")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, default=256)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Invalidation locale : pas de poller en tâche de fond dans le compteur de requêtes
+        os.environ.update(
+            DATABASE_URL=f"sqlite:///{tmp}/view.db", RATE_LIMIT_ENABLED="false", INVALIDATION_BACKEND="local"
+        )
+        sys.path.insert(0, ROOT)
+        os.chdir(ROOT)
+
+        from fastapi.testclient import TestClient
+        from sqlalchemy import event, insert
+
+        import main as app_module
+        from jobs import stop_workers
+        from auth import create_access_token, user_claims
+        from database import SessionLocal, engine
+        from models import Tournament, TournamentRegistration, User, RegistrationStatus, UserRole
+
+        with TestClient(app_module.app) as client:
+            db = SessionLocal()
+            db.execute(insert(User), [
+                {
+                    "email": f"player{i}@example.com", "username": f"player{i}", "full_name": f"Joueur {i}",
+                    "phone": "+2250700000000", "hashed_password": "x", "role": UserRole.PLAYER,
+                    "is_active": True, "is_verified": True, "registration_status": RegistrationStatus.APPROVED,
+                    "payment_proof": f"static/uploads/payments/proof_{i}.jpg",
+                    "profile_picture": f"static/uploads/profiles/player_{i}.jpg",
+                }
+                for i in range(args.players)
+            ])
+            tournament = Tournament(name="Benchmark", registration_fee=0, max_participants=args.players)
+            db.add(tournament)
+            db.flush()
+            user_ids = [row.id for row in db.query(User.id).filter(User.role == UserRole.PLAYER)]
+            db.execute(insert(TournamentRegistration), [
+                {"user_id": user_id, "tournament_id": tournament.id, "status": RegistrationStatus.APPROVED}
+                for user_id in user_ids
+            ])
+            db.commit()
+            admin = db.query(User).filter(User.role == UserRole.ADMIN).first()
+            headers = {"Authorization": f"Bearer {create_access_token(user_claims(admin))}"}
+            tournament_id = tournament.id
+            db.close()
+
+            # /start met la génération en file (202) : mesurer le tableau une fois généré
+            response = client.post(f"/api/tournaments/{tournament_id}/start", headers=headers)
+            response.raise_for_status()
+            wait_for_job(client, response.json()["job_id"], headers)
+            # Workers arrêtés : leurs réclamations de jobs ne sont pas comptées
+            stop_workers()
+
+            counter = [0]
+            event.listen(engine, "before_cursor_execute", lambda *_: counter.__setitem__(0, counter[0] + 1))
+
+            base = f"/api/tournaments/{tournament_id}"
+            old = measure(client, [base, f"{base}/brackets", f"{base}/matches"], counter, args.runs)
+            new = measure(client, [f"{base}/view"], counter, args.runs)
+
+    print(f"Tournoi de {args.players} joueurs")
+    print(f"Ancien (3 appels) : {old[0]:>9} octets, {old[1]:>4} requêtes SQL, {old[2] * 1000:.1f} ms")
+    print(f"/view             : {new[0]:>9} octets, {new[1]:>4} requêtes SQL, {new[2] * 1000:.1f} ms")
+    print(f"Réduction         : {100 * (1 - new[0] / old[0]):.0f} % des octets")
+
+
+if __name__ == "__main__":
+    main()
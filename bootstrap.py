@@ -0,0 +1,231 @@
+"""
+Initialisation unique de la base (tables, index de recherche, compte admin)
+Protégée par un verrou : avec plusieurs workers, un seul l'exécute à la fois
+et les suivants constatent que tout existe déjà. Une fois faite, l'empreinte
+du schéma est enregistrée : les démarrages suivants se limitent à une requête.
+create_all ne crée que les tables absentes : les colonnes déclarées depuis la
+création d'une table sont ajoutées par ALTER TABLE ... ADD COLUMN, avec leur
+valeur par défaut pour les lignes existantes, puis les index manquants sont
+créés (ils peuvent porter sur ces nouvelles colonnes)
+"""
+import hashlib
+import os
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import inspect, literal, text, select
+from sqlalchemy.exc import IntegrityError, DBAPIError
+from sqlalchemy.types import SchemaType
+
+from config import settings
+from database import engine, Base, SessionLocal
+from models import User, UserRole, SchemaInfo
+from search import ensure_search_index
+from player_stats import repair_duplicate_stats
+
+# Clé arbitraire du verrou consultatif PostgreSQL
+BOOTSTRAP_LOCK_KEY = 20260001
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou de fichier, un seul worker en local
+    fcntl = None
+
+
+@contextmanager
+def bootstrap_lock():
+    """Verrou inter-processus : pg_advisory_lock sur PostgreSQL, verrou de fichier sur SQLite"""
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+        return
+
+    database = engine.url.database
+    if fcntl is None or not database or database == ":memory:":
+        yield
+        return
+
+    with open(f"{os.path.abspath(database)}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def schema_fingerprint() -> str:
+    """Empreinte des tables, colonnes et index déclarés dans les modèles"""
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        columns = ",".join(f"{column.name}:{column.type}" for column in table.columns)
+        indexes = ",".join(sorted(index.name for index in table.indexes))
+        parts.append(f"{table.name}({columns})[{indexes}]")
+    return hashlib.sha256(";".join(parts).encode("utf-8")).hexdigest()
+
+
+def bootstrap_is_current() -> bool:
+    """Le schéma enregistré correspond-il aux modèles ? (une seule requête)"""
+    try:
+        with engine.connect() as conn:
+            stored = conn.execute(select(SchemaInfo.fingerprint).where(SchemaInfo.id == 1)).scalar()
+    except DBAPIError:
+        # Base vierge : la table schema_info n'existe pas encore
+        return False
+    return stored == schema_fingerprint()
+
+
+def missing_schema_objects() -> List[str]:
+    """Tables, colonnes et index déclarés dans les modèles mais absents de la base"""
+    missing = []
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            missing.append(table.name)
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in columns)
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index.name for index in table.indexes if index.name not in indexes)
+    return missing
+
+
+def _record_fingerprint():
+    db = SessionLocal()
+    try:
+        info = db.query(SchemaInfo).filter(SchemaInfo.id == 1).first()
+        if not info:
+            info = SchemaInfo(id=1)
+            db.add(info)
+        info.fingerprint = schema_fingerprint()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _column_ddl(column, dialect) -> str:
+    """Définition d'une colonne pour ADD COLUMN (les lignes existantes reçoivent la valeur par défaut)"""
+    preparer = dialect.identifier_preparer
+    ddl = f"{preparer.format_column(column)} {column.type.compile(dialect=dialect)}"
+    default = dialect.ddl_compiler(dialect, None).get_column_default_string(column)
+    if default is None and column.default is not None and column.default.is_scalar:
+        default = str(literal(column.default.arg, column.type).compile(
+            dialect=dialect, compile_kwargs={"literal_binds": True}
+        ))
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    if not column.nullable:
+        if default is None:
+            raise RuntimeError(
+                f"Colonne {column.table.name}.{column.name} : NOT NULL sans valeur par défaut, migration manuelle requise"
+            )
+        ddl += " NOT NULL"
+    for foreign_key in column.foreign_keys:
+        ddl += f" REFERENCES {preparer.format_table(foreign_key.column.table)} ({preparer.format_column(foreign_key.column)})"
+    return ddl
+
+
+def add_missing_columns() -> List[str]:
+    """Ajouter aux tables existantes les colonnes déclarées depuis leur création ; retourne "table.colonne" ajoutées"""
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                if isinstance(column.type, SchemaType):
+                    # Type ENUM natif de PostgreSQL (sans effet sur SQLite)
+                    column.type.create(conn, checkfirst=True)
+                conn.execute(text(
+                    f"ALTER TABLE {conn.dialect.identifier_preparer.format_table(table)} "
+                    f"ADD COLUMN {_column_ddl(column, conn.dialect)}"
+                ))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def create_missing_indexes() -> List[str]:
+    """Créer les index déclarés absents de la base (après add_missing_columns) ; retourne leurs noms"""
+    created = []
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        present = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in present:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+
+def _repair_before_unique_indexes():
+    """Données incompatibles avec un index unique ajouté depuis (doublons de statistiques globales)"""
+    db = SessionLocal()
+    try:
+        repair_duplicate_stats(db)
+    finally:
+        db.close()
+
+
+def create_default_admin() -> bool:
+    """Créer le compte admin par défaut s'il n'existe pas ; retourne True s'il a été créé"""
+    db = SessionLocal()
+    try:
+        if db.query(User.id).filter(User.email == settings.ADMIN_EMAIL).first():
+            return False
+        if settings.ADMIN_PASSWORD_HASH:
+            hashed_password = settings.ADMIN_PASSWORD_HASH
+        else:
+            from auth import get_password_hash
+            hashed_password = get_password_hash(settings.ADMIN_PASSWORD)
+        admin_user = User(
+            email=settings.ADMIN_EMAIL,
+            username="admin",
+            full_name="Administrateur",
+            hashed_password=hashed_password,
+            role=UserRole.ADMIN,
+            is_active=True,
+            is_verified=True
+        )
+        db.add(admin_user)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Créé entre-temps par un autre processus sans verrou (init_db.py lancé à la main)
+            db.rollback()
+            return False
+        return True
+    finally:
+        db.close()
+
+
+def run_bootstrap(force: bool = False) -> bool:
+    """Créer les tables, l'index de recherche et l'admin ; retourne True si l'admin a été créé"""
+    if not force and bootstrap_is_current():
+        return False
+    with bootstrap_lock():
+        # Un autre worker a pu terminer pendant l'attente du verrou
+        if not force and bootstrap_is_current():
+            return False
+        Base.metadata.create_all(bind=engine)
+        # Migration des tables existantes : colonnes, données, puis index sur ces colonnes
+        add_missing_columns()
+        _repair_before_unique_indexes()
+        create_missing_indexes()
+        created = create_default_admin()
+        ensure_search_index(engine)
+        # Empreinte enregistrée seulement si la base correspond vraiment aux modèles :
+        # sinon le prochain démarrage recommence au lieu de croire le schéma à jour
+        missing = missing_schema_objects()
+        if missing:
+            raise RuntimeError(f"Schéma incomplet après initialisation : {', '.join(missing)}")
+        _record_fingerprint()
+    return created
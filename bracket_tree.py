@@ -0,0 +1,200 @@
+"""
+Bracket à élimination directe en tas binaire implicite
+Pour un tableau de L = 2^h places, le nœud 1 est la finale et le nœud i a pour
+enfants 2i et 2i+1 ; les feuilles L..2L-1 sont les places du premier tour.
+Deux tableaux d'entiers décrivent tout le bracket :
+- occupants[i] : joueur qualifié dans le nœud (placé sur une feuille ou
+  vainqueur du match i), 0 si encore inconnu ;
+- match_ids[i] : match joué au nœud interne i, 0 s'il n'est pas encore créé.
+Le match numéro k du tour r occupe le nœud (L >> r) + k - 1.
+La table matches reste la source de vérité : l'arbre en est dérivé (une
+requête) et mis en cache par version de changement du tournoi
+"""
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import Match, RoundType, Tournament
+
+# En-tête binaire : format, nombre de tours
+_HEADER = struct.Struct("<BB")
+_FORMAT_VERSION = 1
+
+_cache: "OrderedDict[int, Tuple[int, BracketTree]]" = OrderedDict()
+
+
+def _zeros(length: int) -> array:
+    return array("i", [0]) * length
+
+
+class BracketTree:
+    """Bracket de 2^rounds places ; lookups sans requête SQL"""
+
+    __slots__ = ("rounds", "size", "occupants", "match_ids", "_leaves")
+
+    def __init__(self, rounds: int, occupants: Optional[array] = None, match_ids: Optional[array] = None):
+        self.rounds = rounds
+        self.size = 1 << rounds  # Nombre de places du premier tour
+        self.occupants = occupants if occupants is not None else _zeros(2 * self.size)
+        self.match_ids = match_ids if match_ids is not None else _zeros(self.size)
+        self._leaves: Optional[Dict[int, int]] = None
+
+    # Navigation (O(1))
+    @staticmethod
+    def parent(node: int) -> int:
+        return node >> 1
+
+    @staticmethod
+    def children(node: int) -> Tuple[int, int]:
+        return node << 1, (node << 1) | 1
+
+    @staticmethod
+    def sibling(node: int) -> int:
+        return node ^ 1
+
+    def is_leaf(self, node: int) -> bool:
+        return node >= self.size
+
+    def round_of(self, node: int) -> int:
+        """Tour (1 = premier tour) du match joué au nœud interne"""
+        return self.rounds - node.bit_length() + 1
+
+    def match_number(self, node: int) -> int:
+        return node - (self.size >> self.round_of(node)) + 1
+
+    def node_of(self, round_number: int, match_number: int) -> Optional[int]:
+        """Nœud du match (tour, numéro) ; None hors du bracket"""
+        if not 1 <= round_number <= self.rounds or not 1 <= match_number <= self.size >> round_number:
+            return None
+        return (self.size >> round_number) + match_number - 1
+
+    # Joueurs (O(log n) après un index construit une fois)
+    def leaf_of(self, user_id: int) -> Optional[int]:
+        if self._leaves is None:
+            self._leaves = {
+                self.occupants[leaf]: leaf
+                for leaf in range(self.size, 2 * self.size)
+                if self.occupants[leaf]
+            }
+        return self._leaves.get(user_id)
+
+    def furthest_node(self, user_id: int) -> Optional[int]:
+        """Nœud le plus haut atteint par le joueur (feuille s'il n'a gagné aucun match)"""
+        node = self.leaf_of(user_id)
+        if node is None:
+            return None
+        while node > 1 and self.occupants[node >> 1] == user_id:
+            node >>= 1
+        return node
+
+    def path_to_final(self, user_id: int) -> List[int]:
+        """Nœuds des matchs du joueur jusqu'à la finale, premier tour en tête"""
+        leaf = self.leaf_of(user_id)
+        if leaf is None:
+            return []
+        path = []
+        node = leaf >> 1
+        while node:
+            path.append(node)
+            node >>= 1
+        return path
+
+    def next_match(self, user_id: int) -> Optional[Tuple[int, Optional[int]]]:
+        """(nœud du prochain match, adversaire ou None si inconnu) ; None si éliminé ou vainqueur"""
+        node = self.furthest_node(user_id)
+        if node is None or node == 1:
+            return None
+        match_node = node >> 1
+        if self.occupants[match_node]:
+            return None  # Match perdu
+        return match_node, self.occupants[node ^ 1] or None
+
+    # Sérialisation compacte (4 octets par nœud)
+    def to_bytes(self) -> bytes:
+        occupants, match_ids = array("i", self.occupants), array("i", self.match_ids)
+        if sys.byteorder == "big":
+            occupants.byteswap()
+            match_ids.byteswap()
+        return _HEADER.pack(_FORMAT_VERSION, self.rounds) + occupants.tobytes() + match_ids.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BracketTree":
+        version, rounds = _HEADER.unpack_from(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Format de bracket inconnu : {version}")
+        size = 1 << rounds
+        offset = _HEADER.size
+        occupants = array("i")
+        occupants.frombytes(data[offset:offset + 8 * size])
+        match_ids = array("i")
+        match_ids.frombytes(data[offset + 8 * size:offset + 12 * size])
+        if sys.byteorder == "big":
+            occupants.byteswap()
+            match_ids.byteswap()
+        return cls(rounds, occupants, match_ids)
+
+    def to_dict(self) -> dict:
+        return {"rounds": self.rounds, "occupants": self.occupants.tolist(), "match_ids": self.match_ids.tolist()}
+
+    @classmethod
+    def from_matches(cls, matches) -> Optional["BracketTree"]:
+        """Arbre dérivé des matchs (round_number, match_number, joueurs, vainqueur) ; None sans match"""
+        matches = sorted(
+            (match for match in matches if match.round_type != RoundType.THIRD_PLACE),
+            key=lambda match: (match.round_number, match.match_number)
+        )
+        first_round = [match for match in matches if match.round_number == 1]
+        if not first_round:
+            return None
+        places = 2 * max(match.match_number for match in first_round)
+        tree = cls(max(1, (places - 1).bit_length()))
+        for match in matches:
+            node = tree.node_of(match.round_number, match.match_number)
+            if node is None:
+                continue
+            tree.match_ids[node] = match.id
+            left, right = tree.children(node)
+            # Un joueur déjà qualifié par un match du tour précédent n'est pas écrasé par 0
+            if match.player1_id:
+                tree.occupants[left] = match.player1_id
+            if match.player2_id:
+                tree.occupants[right] = match.player2_id
+            if match.winner_id:
+                tree.occupants[node] = match.winner_id
+        return tree
+
+
+def _tournament_matches(db: Session, tournament_id: int):
+    return db.execute(
+        select(
+            Match.id, Match.round_type, Match.round_number, Match.match_number,
+            Match.player1_id, Match.player2_id, Match.winner_id
+        ).where(Match.tournament_id == tournament_id)
+    ).all()
+
+
+def get_bracket_tree(db: Session, tournament_id: int) -> Optional[Tuple[int, Optional[BracketTree]]]:
+    """(version, arbre) du tournoi ; None si le tournoi n'existe pas
+
+    Une lecture par clé primaire suffit tant que la version de changement du
+    tournoi n'a pas bougé ; sinon l'arbre est reconstruit depuis les matchs.
+    """
+    version = db.execute(select(Tournament.change_version).where(Tournament.id == tournament_id)).scalar()
+    if version is None:
+        return None
+    cached = _cache.get(tournament_id)
+    if cached is not None and cached[0] == version:
+        _cache.move_to_end(tournament_id)
+        return cached
+    entry = (version, BracketTree.from_matches(_tournament_matches(db, tournament_id)))
+    _cache[tournament_id] = entry
+    _cache.move_to_end(tournament_id)
+    while len(_cache) > settings.BRACKET_TREE_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return entry
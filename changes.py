@@ -0,0 +1,79 @@
+"""
+Versions de changement pour la synchronisation incrémentale (?since=<curseur>)
+Chaque écriture attribue une nouvelle version aux lignes modifiées :
+- matchs : compteur Tournament.change_version du tournoi concerné ;
+- messages : compteur "admin_messages" de cache_versions (partagé avec l'invalidation).
+Le compteur est incrémenté dans la transaction de l'écriture : la ligne
+verrouillée sérialise les écrivains, donc une version n'est jamais validée
+après une version plus grande et aucun client ne saute de changement
+"""
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from invalidation import bump
+from models import AdminMessage, CacheVersion, Match, MatchStatus, MatchTombstone, Tournament
+from player_stats import PLAYED_MATCH_COLUMNS, apply_contribution, match_contribution
+
+MESSAGES_VERSION_KEY = "admin_messages"
+
+
+def next_tournament_version(db: Session, tournament_id: int) -> int:
+    db.execute(
+        update(Tournament)
+        .where(Tournament.id == tournament_id)
+        .values(change_version=Tournament.change_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(select(Tournament.change_version).where(Tournament.id == tournament_id)).scalar_one()
+
+
+def mark_matches_changed(db: Session, tournament_id: int, *criteria) -> int:
+    """Attribuer une nouvelle version aux matchs du tournoi répondant aux critères (tous sinon)"""
+    # Les matchs ajoutés ou modifiés via l'ORM doivent exister en base avant l'UPDATE
+    db.flush()
+    version = next_tournament_version(db, tournament_id)
+    db.execute(
+        update(Match)
+        .where(Match.tournament_id == tournament_id, *criteria)
+        .values(change_version=version)
+        .execution_options(synchronize_session=False)
+    )
+    return version
+
+
+def delete_tournament_matches(db: Session, tournament_id: int):
+    """Supprimer les matchs d'un tournoi en laissant une tombstone pour chacun
+
+    Les matchs joués (dont les exempts) sortent aussi des statistiques : une
+    régénération ne compte pas deux fois la même ronde.
+    """
+    match_ids = db.execute(select(Match.id).where(Match.tournament_id == tournament_id)).scalars().all()
+    if not match_ids:
+        return
+    played = db.execute(
+        select(*PLAYED_MATCH_COLUMNS).where(Match.tournament_id == tournament_id, Match.status == MatchStatus.PLAYED)
+    ).all()
+    for match in played:
+        apply_contribution(db, tournament_id, match_contribution(match), sign=-1)
+    version = next_tournament_version(db, tournament_id)
+    db.execute(insert(MatchTombstone), [
+        {"tournament_id": tournament_id, "match_id": match_id, "change_version": version}
+        for match_id in match_ids
+    ])
+    db.execute(
+        delete(Match).where(Match.tournament_id == tournament_id).execution_options(synchronize_session=False)
+    )
+
+
+def mark_message_changed(db: Session, message: AdminMessage) -> int:
+    """Nouvelle version pour un message créé, modifié ou désactivé"""
+    bump(db, MESSAGES_VERSION_KEY)
+    version = db.execute(select(CacheVersion.version).where(CacheVersion.key == MESSAGES_VERSION_KEY)).scalar_one()
+    message.change_version = version
+    return version
+
+
+def current_messages_version(db: Session) -> int:
+    return db.execute(
+        select(CacheVersion.version).where(CacheVersion.key == MESSAGES_VERSION_KEY)
+    ).scalar() or 0
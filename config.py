@@ -7,21 +7,100 @@ class Settings(BaseSettings):
     # Application
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-this-secret-key-in-production-min-32-chars")
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_DAYS: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
     
     # Database
     # Pour Render/PostgreSQL, utiliser la variable d'environnement DATABASE_URL
     # Pour SQLite local, utiliser sqlite:///./efootball_tournament.db
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./efootball_tournament.db")
+    # SQLite : "performance" (WAL, synchronous=NORMAL, busy_timeout, mmap...) ou "default" (aucun pragma)
+    SQLITE_PROFILE: str = os.getenv("SQLITE_PROFILE", "performance")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+    # Réplique en lecture seule pour les GET publics (désactivée si vide)
+    DATABASE_REPLICA_URL: Optional[str] = os.getenv("DATABASE_REPLICA_URL") or None
+    # Après une écriture, les lectures du même client restent sur le primaire pendant ce délai
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+    # Après une panne de la réplique, délai avant de la réessayer
+    REPLICA_RETRY_SECONDS: float = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
     
     # Admin
     ADMIN_EMAIL: str = os.getenv("ADMIN_EMAIL", "admin@tournament.com")
     ADMIN_PASSWORD: str = os.getenv("ADMIN_PASSWORD", "ChangeMe123!")
+    # Hash bcrypt pré-calculé : évite tout hachage au premier démarrage
+    ADMIN_PASSWORD_HASH: Optional[str] = os.getenv("ADMIN_PASSWORD_HASH")
     
     # File Upload
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "static/uploads")
     MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", "5242880"))  # 5MB
     ALLOWED_EXTENSIONS: set = set(os.getenv("ALLOWED_EXTENSIONS", "jpg,jpeg,png,pdf").split(","))
+    # Durée de cache des fichiers nommés par hash de contenu (immuables)
+    UPLOAD_CACHE_MAX_AGE: int = int(os.getenv("UPLOAD_CACHE_MAX_AGE", "31536000"))
+    # Préfixe d'une location nginx "internal" : le proxy envoie le fichier (X-Accel-Redirect)
+    UPLOAD_ACCEL_REDIRECT_PREFIX: Optional[str] = os.getenv("UPLOAD_ACCEL_REDIRECT_PREFIX") or None
+    
+    # Rétention des logs d'activité
+    ACTIVITY_LOG_RETENTION_DAYS: int = int(os.getenv("ACTIVITY_LOG_RETENTION_DAYS", "90"))
+    ACTIVITY_LOG_ARCHIVE_DIR: str = os.getenv("ACTIVITY_LOG_ARCHIVE_DIR", "archives/activity_logs")
+    ACTIVITY_LOG_PURGE_BATCH_SIZE: int = int(os.getenv("ACTIVITY_LOG_PURGE_BATCH_SIZE", "1000"))
+    
+    # Tableau de bord admin : durée de mise en cache du résumé (0 = pas de cache)
+    ADMIN_SUMMARY_CACHE_SECONDS: float = float(os.getenv("ADMIN_SUMMARY_CACHE_SECONDS", "5"))
+    
+    # Classement Elo (têtes de série)
+    RATING_INITIAL: float = float(os.getenv("RATING_INITIAL", "1500"))
+    RATING_K_FACTOR: float = float(os.getenv("RATING_K_FACTOR", "32"))
+    
+    # Profilage à la demande (X-Profile: 1 ou ?profile=1, administrateurs uniquement)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "1"))
+    # Profils gardés en mémoire par worker (les plus lents)
+    PROFILE_STORE_SIZE: int = int(os.getenv("PROFILE_STORE_SIZE", "20"))
+    
+    # Retard de la boucle d'événements (mesure continue, blocages attribués à la route en cours)
+    LOOP_LAG_MONITOR_ENABLED: bool = os.getenv("LOOP_LAG_MONITOR_ENABLED", "true").lower() == "true"
+    LOOP_LAG_INTERVAL_MS: float = float(os.getenv("LOOP_LAG_INTERVAL_MS", "50"))
+    LOOP_LAG_STALL_MS: float = float(os.getenv("LOOP_LAG_STALL_MS", "100"))
+    LOOP_LAG_WINDOW: int = int(os.getenv("LOOP_LAG_WINDOW", "12000"))  # Échantillons gardés (10 min à 50 ms)
+    LOOP_LAG_STALL_HISTORY: int = int(os.getenv("LOOP_LAG_STALL_HISTORY", "50"))
+    LOOP_LAG_STACK_DEPTH: int = int(os.getenv("LOOP_LAG_STACK_DEPTH", "40"))
+    
+    # Snapshots des tournois terminés (vue figée, gzip, cache navigateur d'un an)
+    TOURNAMENT_SNAPSHOT_DIR: str = os.getenv("TOURNAMENT_SNAPSHOT_DIR", "archives/tournaments")
+    TOURNAMENT_SNAPSHOT_CACHE_MAX_AGE: int = int(os.getenv("TOURNAMENT_SNAPSHOT_CACHE_MAX_AGE", "31536000"))
+    # Dossier sur un disque persistant (conservé entre les déploiements) : requis pour supprimer les brackets
+    TOURNAMENT_SNAPSHOT_DURABLE: bool = os.getenv("TOURNAMENT_SNAPSHOT_DURABLE", "false").lower() == "true"
+    # Supprimer les lignes Bracket une fois le snapshot écrit (défaut de /finish)
+    TOURNAMENT_SNAPSHOT_PRUNE_BRACKETS: bool = os.getenv("TOURNAMENT_SNAPSHOT_PRUNE_BRACKETS", "false").lower() == "true"
+    
+    # Brackets en tas binaire : nombre de tournois gardés en mémoire par worker
+    BRACKET_TREE_CACHE_SIZE: int = int(os.getenv("BRACKET_TREE_CACHE_SIZE", "256"))
+    
+    # File de jobs en base (0 worker : jobs exécutés par `python jobs.py` uniquement)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", "1"))
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+    
+    # Démarrage multi-workers
+    RUN_BOOTSTRAP_ON_STARTUP: bool = os.getenv("RUN_BOOTSTRAP_ON_STARTUP", "true").lower() == "true"
+    INVALIDATION_BACKEND: str = os.getenv("INVALIDATION_BACKEND", "db")  # db (plusieurs workers) ou local
+    INVALIDATION_POLL_SECONDS: float = float(os.getenv("INVALIDATION_POLL_SECONDS", "2"))
+    
+    # Limitation de débit des routes qui hachent des mots de passe (format "N/second|minute|hour|day")
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "local")  # local (par worker) ou db (partagé)
+    RATE_LIMIT_LOGIN_PER_IP: str = os.getenv("RATE_LIMIT_LOGIN_PER_IP", "20/minute")
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: str = os.getenv("RATE_LIMIT_LOGIN_PER_ACCOUNT", "5/minute")
+    RATE_LIMIT_REGISTER_PER_IP: str = os.getenv("RATE_LIMIT_REGISTER_PER_IP", "5/minute")
+    RATE_LIMIT_REGISTER_PER_ACCOUNT: str = os.getenv("RATE_LIMIT_REGISTER_PER_ACCOUNT", "3/minute")
+    # Derrière un proxy de confiance (Render) : utiliser X-Forwarded-For comme IP cliente
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+    # Nombre de proxies de confiance devant l'application (chacun ajoute une entrée à droite)
+    RATE_LIMIT_FORWARDED_HOPS: int = int(os.getenv("RATE_LIMIT_FORWARDED_HOPS", "1"))
     
     # CORS
     CORS_ORIGINS: list = ["*"]
@@ -33,8 +112,9 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-# Créer le dossier uploads s'il n'existe pas
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-os.makedirs(f"{settings.UPLOAD_DIR}/profiles", exist_ok=True)
-os.makedirs(f"{settings.UPLOAD_DIR}/payments", exist_ok=True)
+
+def ensure_upload_dirs():
+    """Créer les dossiers d'upload s'ils n'existent pas (au premier upload, pas à l'import)"""
+    os.makedirs(f"{settings.UPLOAD_DIR}/profiles", exist_ok=True)
+    os.makedirs(f"{settings.UPLOAD_DIR}/payments", exist_ok=True)
 
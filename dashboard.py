@@ -0,0 +1,115 @@
+"""
+Résumé du tableau de bord administrateur
+Tous les compteurs sont calculés par agrégation SQL en deux requêtes
+(une pour les compteurs, une pour le remplissage des tournois) au lieu de
+charger les listes complètes côté navigateur. Le résultat est gardé quelques
+secondes en mémoire (ADMIN_SUMMARY_CACHE_SECONDS)
+"""
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import ActivityLog, RegistrationStatus, Tournament, TournamentRegistration, User
+
+# Fenêtres des taux d'activité récents
+ACTIVITY_WINDOWS = {"last_hour": timedelta(hours=1), "last_24h": timedelta(days=1), "last_7d": timedelta(days=7)}
+
+_cache = {"expires_at": 0.0, "summary": None}
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _counters_query(now: datetime):
+    """Une seule requête : agrégats sur users et sous-requêtes scalaires pour le reste"""
+    columns = [
+        func.count(User.id).label("users_total"),
+        _count_if(User.is_active == True).label("users_active"),
+        _count_if(User.is_active == False).label("users_blocked"),
+        _count_if(User.payment_proof.isnot(None) & (User.registration_status == RegistrationStatus.PENDING))
+        .label("pending_payment_proofs"),
+    ]
+    for registration_status in RegistrationStatus:
+        columns.append(_count_if(User.registration_status == registration_status).label(f"users_{registration_status.value}"))
+        columns.append(
+            select(func.count(TournamentRegistration.id))
+            .where(TournamentRegistration.status == registration_status)
+            .scalar_subquery()
+            .label(f"registrations_{registration_status.value}")
+        )
+    columns.append(
+        select(func.count(TournamentRegistration.id))
+        .where(
+            TournamentRegistration.status == RegistrationStatus.PENDING,
+            TournamentRegistration.payment_proof.isnot(None)
+        )
+        .scalar_subquery()
+        .label("pending_registration_proofs")
+    )
+    for name, window in ACTIVITY_WINDOWS.items():
+        # ActivityLog.created_at est indexé : simples parcours d'intervalle
+        columns.append(
+            select(func.count(ActivityLog.id))
+            .where(ActivityLog.created_at >= now - window)
+            .scalar_subquery()
+            .label(f"activity_{name}")
+        )
+    return select(*columns).select_from(User)
+
+
+def build_admin_summary(db: Session) -> dict:
+    now = datetime.utcnow()
+    counters = db.execute(_counters_query(now)).mappings().one()
+
+    tournaments = db.execute(
+        select(
+            Tournament.id, Tournament.name, Tournament.current_participants,
+            Tournament.max_participants, Tournament.is_started
+        )
+        .where(Tournament.is_active == True)
+        .order_by(Tournament.id)
+    ).all()
+
+    return {
+        "users": {
+            "total": counters["users_total"],
+            "active": counters["users_active"],
+            "blocked": counters["users_blocked"],
+            "by_registration_status": {
+                registration_status.value: counters[f"users_{registration_status.value}"]
+                for registration_status in RegistrationStatus
+            },
+        },
+        "registrations": {
+            registration_status.value: counters[f"registrations_{registration_status.value}"]
+            for registration_status in RegistrationStatus
+        },
+        "pending_payment_proofs": counters["pending_payment_proofs"] + counters["pending_registration_proofs"],
+        "tournaments": [
+            {
+                "id": row.id,
+                "name": row.name,
+                "current_participants": row.current_participants,
+                "max_participants": row.max_participants,
+                "fill_rate": round(row.current_participants / row.max_participants, 3) if row.max_participants else 0.0,
+                "is_started": row.is_started,
+            }
+            for row in tournaments
+        ],
+        "activity": {name: counters[f"activity_{name}"] for name in ACTIVITY_WINDOWS},
+        "generated_at": now,
+    }
+
+
+def get_admin_summary(db: Session) -> dict:
+    """Résumé mis en cache quelques secondes (plusieurs admins, rafraîchissements répétés)"""
+    if _cache["summary"] is not None and time.monotonic() < _cache["expires_at"]:
+        return _cache["summary"]
+    summary = build_admin_summary(db)
+    _cache["summary"] = summary
+    _cache["expires_at"] = time.monotonic() + settings.ADMIN_SUMMARY_CACHE_SECONDS
+    return summary
@@ -1,26 +1,149 @@
-from sqlalchemy import create_engine
+import json
+import logging
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+# Session de la requête ouverte, en attente de commit ou de rollback
+_UNIT_OF_WORK_PENDING = "unit_of_work_pending"
+
+
+def sqlite_pragmas(profile: str, in_memory: bool = False) -> list:
+    """Pragmas appliqués à chaque connexion SQLite selon le profil (SQLITE_PROFILE)"""
+    if profile != "performance":
+        return []
+    pragmas = [
+        # WAL : les lecteurs ne sont plus bloqués par l'écrivain
+        ("journal_mode", "WAL"),
+        # En WAL, NORMAL ne synchronise qu'aux checkpoints (commit durable sauf coupure de courant)
+        ("synchronous", "NORMAL"),
+        # Attendre le verrou d'écriture plutôt qu'échouer immédiatement ("database is locked")
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT_MS),
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        # Valeur négative : taille en Kio
+        ("cache_size", -settings.SQLITE_CACHE_SIZE_KB),
+        ("temp_store", "MEMORY"),
+        ("foreign_keys", "ON"),
+    ]
+    if in_memory:
+        pragmas = [(name, value) for name, value in pragmas if name not in ("journal_mode", "mmap_size")]
+    return pragmas
+
+
+def _create_engine(url: str, **kwargs):
+    if not url.startswith("sqlite"):
+        return create_engine(url, **kwargs)
+    
+    new_engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+    pragmas = sqlite_pragmas(settings.SQLITE_PROFILE, in_memory=new_engine.url.database in (None, "", ":memory:"))
+    if pragmas:
+        @event.listens_for(new_engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+    return new_engine
+
+
 # Créer le moteur de base de données
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(settings.DATABASE_URL)
+engine = _create_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Réplique en lecture seule (optionnelle) pour les GET publics, voir replica.py
+# pool_pre_ping : une réplique redémarrée est détectée à l'emprunt de la connexion
+replica_engine = (
+    _create_engine(settings.DATABASE_REPLICA_URL, pool_pre_ping=True)
+    if settings.DATABASE_REPLICA_URL else None
+)
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None else None
+)
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency pour obtenir une session de base de données"""
+def end_unit_of_work(db: Session, commit: bool):
+    """Valider (commit=True) ou annuler la session de la requête, une seule fois"""
+    if not db.info.pop(_UNIT_OF_WORK_PENDING, False):
+        return
+    if not commit:
+        db.rollback()
+        return
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def get_db(request: Request):
+    """Dependency pour obtenir une session de base de données (unité de travail de la requête)
+
+    Les handlers préparent leurs changements et leurs logs d'audit sans commit
+    (flush si un identifiant est nécessaire) : la session est validée une seule
+    fois pour toute la requête, juste avant l'envoi d'une réponse réussie
+    (UnitOfWorkMiddleware), et annulée si la requête échoue.
+    """
     db = SessionLocal()
+    db.info[_UNIT_OF_WORK_PENDING] = True
+    request.state.db = db
     try:
         yield db
+        # Versions de FastAPI où la dépendance se termine avant l'envoi de la réponse :
+        # le commit a lieu ici (sans effet si le middleware l'a déjà fait)
+        end_unit_of_work(db, commit=True)
+    except Exception:
+        end_unit_of_work(db, commit=False)
+        raise
     finally:
         db.close()
 
+
+class UnitOfWorkMiddleware:
+    """Commit de la session de la requête au début de la réponse (rollback si statut >= 400)
+
+    Si le commit échoue, le client reçoit une erreur 500 au lieu de la réponse prévue.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Partagé avec request.state : get_db y dépose la session
+        state = scope.setdefault("state", {})
+        failed = False
+
+        async def send_after_commit(message):
+            nonlocal failed
+            if failed:
+                return
+            if message["type"] == "http.response.start" and state.get("db") is not None:
+                try:
+                    await run_in_threadpool(end_unit_of_work, state["db"], message["status"] < 400)
+                except Exception:
+                    logger.exception("Échec du commit de la requête %s %s", scope["method"], scope["path"])
+                    failed = True
+                    body = json.dumps({"detail": "Erreur lors de l'enregistrement"}).encode()
+                    await send({
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+            await send(message)
+
+        await self.app(scope, receive, send_after_commit)
+
@@ -0,0 +1,97 @@
+"""
+Export des données d'administration en flux CSV ou NDJSON
+Les lignes sont lues par lots (yield_per / curseur serveur) et écrites au fil
+de l'eau : la mémoire utilisée ne dépend pas du nombre de lignes
+"""
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import User, TournamentRegistration, Match, ActivityLog
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Colonnes exportées par jeu de données (jamais le mot de passe hashé)
+EXPORT_DATASETS = {
+    "users": (
+        User.id, User.email, User.username, User.full_name, User.phone,
+        User.role, User.is_active, User.is_verified, User.registration_status,
+        User.created_at, User.last_login,
+    ),
+    "registrations": (
+        TournamentRegistration.id, TournamentRegistration.user_id,
+        TournamentRegistration.tournament_id, TournamentRegistration.status,
+        TournamentRegistration.payment_proof, TournamentRegistration.notes,
+        TournamentRegistration.created_at, TournamentRegistration.reviewed_at,
+        TournamentRegistration.reviewed_by,
+    ),
+    "matches": (
+        Match.id, Match.tournament_id, Match.round_type, Match.round_number,
+        Match.match_number, Match.player1_id, Match.player2_id,
+        Match.player1_score, Match.player2_score, Match.winner_id, Match.status,
+        Match.scheduled_at, Match.played_at,
+    ),
+    "activity-logs": (
+        ActivityLog.id, ActivityLog.user_id, ActivityLog.action,
+        ActivityLog.details, ActivityLog.ip_address, ActivityLog.created_at,
+    ),
+}
+
+
+def _plain(value):
+    """Convertir une valeur de colonne en type sérialisable"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _iter_batches(dataset: str) -> Iterator[list]:
+    columns = EXPORT_DATASETS[dataset]
+    # Session dédiée : le flux continue après la fin du handler
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            select(*columns)
+            .order_by(columns[0])
+            .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+        )
+        for batch in result.partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def stream_export(dataset: str, fmt: str) -> Iterator[str]:
+    """Générer l'export d'un jeu de données, par morceaux de EXPORT_BATCH_SIZE lignes"""
+    names = [column.key for column in EXPORT_DATASETS[dataset]]
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        # L'en-tête part immédiatement, avant la première requête
+        yield buffer.getvalue()
+        for batch in _iter_batches(dataset):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_plain(value) for value in row] for row in batch)
+            yield buffer.getvalue()
+    else:
+        for batch in _iter_batches(dataset):
+            yield "".join(
+                json.dumps(dict(zip(names, map(_plain, row))), ensure_ascii=False) + "\n"
+                for row in batch
+            )
@@ -0,0 +1,108 @@
+"""
+Invalidation partagée entre workers
+Chaque clé possède un compteur de version dans la table cache_versions.
+bump() l'incrémente dans la transaction de l'appelant ; après le commit, les
+abonnés du processus courant sont prévenus immédiatement, et les autres
+workers le sont au prochain passage du poller (INVALIDATION_POLL_SECONDS).
+Avec INVALIDATION_BACKEND=local, seule la diffusion locale est utilisée
+(un seul processus, pas de requête périodique)
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, List
+
+from sqlalchemy import event, select, update, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from database import SessionLocal
+from models import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[str, int], None]
+
+
+_subscribers: Dict[str, List[Callback]] = {}
+_known_versions: Dict[str, int] = {}
+
+
+def subscribe(key: str, callback: Callback):
+    """Appeler callback(key, version) à chaque invalidation de la clé"""
+    _subscribers.setdefault(key, []).append(callback)
+
+
+def _notify(key: str, version: int):
+    if _known_versions.get(key, -1) >= version:
+        return
+    _known_versions[key] = version
+    for callback in _subscribers.get(key, []):
+        try:
+            callback(key, version)
+        except Exception:
+            logger.exception("Échec de l'invalidation de %s", key)
+
+
+def bump(db: Session, key: str):
+    """Invalider une clé pour tous les workers (effectif au commit de db)"""
+    result = db.execute(
+        update(CacheVersion).where(CacheVersion.key == key).values(version=CacheVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        try:
+            with db.begin_nested():
+                db.execute(insert(CacheVersion).values(key=key, version=1))
+        except IntegrityError:
+            db.execute(
+                update(CacheVersion).where(CacheVersion.key == key).values(version=CacheVersion.version + 1)
+            )
+    db.info.setdefault("invalidated_keys", set()).add(key)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_after_commit(session):
+    keys = session.info.pop("invalidated_keys", None)
+    if not keys:
+        return
+    # Diffusion locale immédiate : le worker qui écrit n'attend pas le poller
+    for key in keys:
+        _notify(key, _known_versions.get(key, 0) + 1)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("invalidated_keys", None)
+
+
+def load_versions(notify: bool = True):
+    """Lire tous les compteurs (table minuscule) et prévenir les abonnés des clés modifiées"""
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(CacheVersion.key, CacheVersion.version)).all()
+    finally:
+        db.close()
+    for key, version in rows:
+        if notify:
+            _notify(key, version)
+        else:
+            _known_versions[key] = max(_known_versions.get(key, 0), version)
+
+
+async def poll_versions():
+    """Tâche de fond : relire les compteurs à intervalle régulier"""
+    while True:
+        await asyncio.sleep(settings.INVALIDATION_POLL_SECONDS)
+        try:
+            await run_in_threadpool(load_versions)
+        except Exception:
+            logger.exception("Lecture des versions d'invalidation impossible")
+
+
+def start_invalidation_listener():
+    """Démarrer le poller (backend db) ; retourne la tâche à annuler à l'arrêt, ou None"""
+    if settings.INVALIDATION_BACKEND != "db":
+        return None
+    load_versions(notify=False)
+    return asyncio.create_task(poll_versions())
@@ -0,0 +1,247 @@
+"""
+File de jobs persistante (table jobs), sans broker externe
+enqueue() enregistre le job dans la transaction de l'appelant et retourne
+immédiatement ; des threads workers le réclament par mise à jour conditionnelle
+(compatible SQLite et PostgreSQL), l'exécutent avec une session dédiée et
+réessaient avec un délai exponentiel en cas d'échec. Un job en cours garde un
+bail (locked_until) : si le processus meurt, un autre worker le reprend à
+l'expiration du bail. Les handlers doivent donc être rejouables
+
+Usage (worker seul, sans serveur web) : python jobs.py
+"""
+import json
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event, or_, select, and_, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+from models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# handler(db, payload, progress) -> résultat sérialisable en JSON
+Handler = Callable[[Session, dict, Callable[[float, Optional[str]], None]], Optional[dict]]
+
+_handlers: Dict[str, Handler] = {}
+_wakeup = threading.Event()
+_stop = threading.Event()
+_threads: List[threading.Thread] = []
+
+
+class PermanentJobError(Exception):
+    """Échec définitif : le job n'est pas réessayé (données invalides, état incompatible)"""
+
+
+def job_handler(kind: str):
+    """Décorateur : enregistrer le handler d'un type de job"""
+    def register(func: Handler) -> Handler:
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: dict,
+    created_by: Optional[int] = None,
+    dedupe_key: Optional[str] = None,
+    max_attempts: Optional[int] = None
+) -> Job:
+    """Ajouter un job (effectif au commit de db) ; réutilise le job actif de même dedupe_key"""
+    if dedupe_key:
+        existing = db.query(Job).filter(
+            Job.dedupe_key == dedupe_key,
+            Job.status.in_((JobStatus.QUEUED, JobStatus.RUNNING))
+        ).first()
+        if existing:
+            return existing
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        dedupe_key=dedupe_key,
+        status=JobStatus.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow(),
+        progress=0.0,
+        created_by=created_by
+    )
+    db.add(job)
+    db.flush()  # Identifiant à renvoyer au client
+    db.info["jobs_enqueued"] = True
+    return job
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _wake_workers_after_commit(session):
+    # Les workers du processus courant démarrent sans attendre leur prochain passage
+    if session.info.pop("jobs_enqueued", False):
+        _wakeup.set()
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+        and_(Job.status == JobStatus.RUNNING, Job.locked_until < now)
+    )
+
+
+def claim_next(worker_id: str) -> Optional[int]:
+    """Réclamer le plus ancien job prêt ; None si aucun"""
+    db = SessionLocal()
+    try:
+        for _ in range(5):
+            now = datetime.utcnow()
+            job_id = db.execute(
+                select(Job.id).where(_claimable(now)).order_by(Job.run_after, Job.id).limit(1)
+            ).scalar()
+            if job_id is None:
+                return None
+            # Compare-and-set : un seul worker voit rowcount == 1
+            result = db.execute(
+                update(Job)
+                .where(Job.id == job_id, _claimable(now))
+                .values(
+                    status=JobStatus.RUNNING,
+                    locked_by=worker_id,
+                    locked_until=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                    attempts=Job.attempts + 1,
+                    started_at=now
+                )
+            )
+            db.commit()
+            if result.rowcount == 1:
+                return job_id
+        return None
+    finally:
+        db.close()
+
+
+def _report_progress(job_id: int, worker_id: str):
+    def progress(fraction: float, message: Optional[str] = None):
+        # Session séparée : visible immédiatement, prolonge le bail du job
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.locked_by == worker_id)
+                .values(
+                    progress=max(0.0, min(fraction, 1.0)),
+                    progress_message=message,
+                    locked_until=datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+    return progress
+
+
+def _finish(job_id: int, worker_id: str, **values):
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id)
+            .values(locked_by=None, locked_until=None, **values)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_job(job_id: int, worker_id: str):
+    """Exécuter un job réclamé et enregistrer son résultat ou son échec"""
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        attempts, max_attempts = job.attempts, job.max_attempts
+        try:
+            handler = _handlers.get(job.kind)
+            if handler is None:
+                raise PermanentJobError(f"Type de job inconnu : {job.kind}")
+            result = handler(db, json.loads(job.payload), _report_progress(job_id, worker_id))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            error = e
+        else:
+            error = None
+    finally:
+        db.close()
+
+    if error is None:
+        _finish(
+            job_id, worker_id,
+            status=JobStatus.SUCCEEDED, progress=1.0, error=None,
+            result=json.dumps(result) if result is not None else None,
+            finished_at=datetime.utcnow()
+        )
+    elif isinstance(error, PermanentJobError) or attempts >= max_attempts:
+        logger.warning("Job %s en échec définitif : %s", job_id, error)
+        _finish(job_id, worker_id, status=JobStatus.FAILED, error=str(error), finished_at=datetime.utcnow())
+    else:
+        delay = settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+        logger.warning("Job %s en échec (tentative %s), nouvel essai dans %ss : %s", job_id, attempts, delay, error)
+        _finish(
+            job_id, worker_id,
+            status=JobStatus.QUEUED, error=str(error),
+            run_after=datetime.utcnow() + timedelta(seconds=delay)
+        )
+
+
+def _worker_loop(worker_id: str):
+    while not _stop.is_set():
+        try:
+            job_id = claim_next(worker_id)
+        except Exception:
+            logger.exception("Réclamation de job impossible")
+            job_id = None
+        if job_id is None:
+            _wakeup.wait(settings.JOB_POLL_SECONDS)
+            _wakeup.clear()
+            continue
+        try:
+            run_job(job_id, worker_id)
+        except Exception:
+            # Le bail expirera et le job sera repris
+            logger.exception("Exécution du job %s interrompue", job_id)
+
+
+def start_workers(count: Optional[int] = None):
+    """Démarrer le pool de workers du processus (threads démons)"""
+    count = settings.JOB_WORKERS if count is None else count
+    _stop.clear()
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    for index in range(count):
+        thread = threading.Thread(target=_worker_loop, args=(f"{prefix}:{index}",), name=f"job-worker-{index}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+
+
+def stop_workers(timeout: float = 5.0):
+    """Arrêter les workers ; un job interrompu sera repris à l'expiration de son bail"""
+    _stop.set()
+    _wakeup.set()
+    for thread in _threads:
+        thread.join(timeout)
+    _threads.clear()
+
+
+if __name__ == "__main__":
+    import main  # noqa: F401  Enregistre les handlers déclarés par les routes
+
+    logging.basicConfig(level=logging.INFO)
+    start_workers(max(settings.JOB_WORKERS, 1))
+    try:
+        _stop.wait()
+    except KeyboardInterrupt:
+        stop_workers()
@@ -0,0 +1,169 @@
+"""
+Surveillance du retard de la boucle d'événements
+Les handlers sont async mais font des appels bloquants (base, bcrypt,
+écritures de fichiers) : tant qu'ils tournent, aucune autre requête du
+worker n'avance. Une tâche se réveille toutes les LOOP_LAG_INTERVAL_MS et
+mesure son retard de réveil (fenêtre glissante -> percentiles). Un thread de
+garde vérifie que ce réveil arrive : au-delà de LOOP_LAG_STALL_MS de retard,
+la boucle est bloquée ; il relève alors la pile du thread de la boucle et la
+route de la requête en cours (tâche courante -> scope noté par le middleware).
+Mesures par worker, exposées par /api/admin/metrics
+"""
+import asyncio
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import settings
+from profiling import frame_label
+
+OUTSIDE_REQUEST = "(hors requête)"
+
+_samples: deque = deque(maxlen=settings.LOOP_LAG_WINDOW)
+_stalls: deque = deque(maxlen=settings.LOOP_LAG_STALL_HISTORY)
+_by_route: Dict[str, dict] = {}
+# Tâche asyncio -> scope de la requête qu'elle traite
+_running: Dict[asyncio.Task, dict] = {}
+_lock = threading.Lock()
+_stop = threading.Event()
+# Réveil attendu de la tâche de mesure, blocage relevé par le thread de garde
+_state = {"loop": None, "thread_id": None, "expected_at": None, "pending": None}
+
+
+def _route_of(task) -> str:
+    scope = _running.get(task)
+    if scope is None:
+        return task.get_name() if task is not None else OUTSIDE_REQUEST
+    # Gabarit de la route (ajouté au scope par le routeur) plutôt que le chemin concret
+    route = getattr(scope.get("route"), "path", None) or scope.get("path")
+    return f"{scope.get('method')} {route}"
+
+
+def _snapshot(expected_at: float) -> dict:
+    """Route et pile du thread de la boucle, pendant le blocage"""
+    frame = sys._current_frames().get(_state["thread_id"])
+    stack = []
+    while frame is not None and len(stack) < settings.LOOP_LAG_STACK_DEPTH:
+        stack.append(frame_label(frame.f_code) + f" ligne {frame.f_lineno}")
+        frame = frame.f_back
+    return {
+        "expected_at": expected_at,
+        "route": _route_of(asyncio.current_task(_state["loop"])),
+        "detected_at": datetime.utcnow().isoformat(),
+        "stack": stack[::-1]
+    }
+
+
+def _watchdog():
+    threshold = settings.LOOP_LAG_STALL_MS / 1000
+    while not _stop.wait(threshold / 2):
+        expected_at, pending = _state["expected_at"], _state["pending"]
+        if expected_at is None or (pending is not None and pending["expected_at"] == expected_at):
+            continue
+        if time.perf_counter() - expected_at > threshold:
+            snapshot = _snapshot(expected_at)
+            with _lock:
+                _state["pending"] = snapshot
+
+
+def _record(lag_ms: float, expected_at: float):
+    _samples.append(lag_ms)
+    if lag_ms < settings.LOOP_LAG_STALL_MS:
+        return
+    stall = _state["pending"]
+    _state["pending"] = None
+    # Un relevé d'un réveil précédent (pris juste après la fin du blocage) ne compte pas
+    if stall is None or stall["expected_at"] != expected_at:
+        # Blocage terminé avant le passage du thread de garde : durée connue, pile perdue
+        stall = {"route": "(inconnue)", "detected_at": datetime.utcnow().isoformat(), "stack": []}
+    stall.pop("expected_at", None)
+    stall["lag_ms"] = round(lag_ms, 1)
+    _stalls.append(stall)
+    totals = _by_route.setdefault(stall["route"], {"stalls": 0, "total_ms": 0.0, "max_ms": 0.0})
+    totals["stalls"] += 1
+    totals["total_ms"] += lag_ms
+    totals["max_ms"] = max(totals["max_ms"], lag_ms)
+
+
+async def _measure():
+    interval = settings.LOOP_LAG_INTERVAL_MS / 1000
+    while True:
+        expected_at = time.perf_counter() + interval
+        _state["expected_at"] = expected_at
+        await asyncio.sleep(interval)
+        lag_ms = max(0.0, time.perf_counter() - expected_at) * 1000
+        with _lock:
+            _record(lag_ms, expected_at)
+
+
+def start_loop_monitor():
+    """Démarrer la mesure (tâche) et le thread de garde ; retourne la tâche à annuler, ou None"""
+    if not settings.LOOP_LAG_MONITOR_ENABLED:
+        return None
+    _state.update(loop=asyncio.get_running_loop(), thread_id=threading.get_ident(), expected_at=None, pending=None)
+    _stop.clear()
+    threading.Thread(target=_watchdog, name="loop-lag-watchdog", daemon=True).start()
+    return asyncio.create_task(_measure())
+
+
+def stop_loop_monitor(task):
+    _stop.set()
+    if task:
+        task.cancel()
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2)
+
+
+def loop_lag_metrics() -> dict:
+    """Percentiles du retard sur la fenêtre et blocages cumulés par route (les plus coûteuses d'abord)"""
+    with _lock:
+        ordered = sorted(_samples)
+        routes = [{"route": route, **totals} for route, totals in _by_route.items()]
+    routes.sort(key=lambda entry: entry["total_ms"], reverse=True)
+    return {
+        "interval_ms": settings.LOOP_LAG_INTERVAL_MS,
+        "stall_threshold_ms": settings.LOOP_LAG_STALL_MS,
+        "samples": len(ordered),
+        "lag_ms": {
+            "p50": _percentile(ordered, 0.5),
+            "p90": _percentile(ordered, 0.9),
+            "p99": _percentile(ordered, 0.99),
+            "max": round(ordered[-1], 2) if ordered else None
+        },
+        "stalls": sum(entry["stalls"] for entry in routes),
+        "by_route": [
+            {**entry, "total_ms": round(entry["total_ms"], 1), "max_ms": round(entry["max_ms"], 1)}
+            for entry in routes
+        ]
+    }
+
+
+def recent_stalls() -> List[dict]:
+    """Derniers blocages, le plus récent en tête, avec la pile relevée"""
+    with _lock:
+        return list(reversed(_stalls))
+
+
+class LoopLagMiddleware:
+    """Middleware ASGI : note la requête traitée par chaque tâche (un dict, pas de mesure ici)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.LOOP_LAG_MONITOR_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        _running[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _running.pop(task, None)
@@ -1,46 +1,50 @@
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import os
 
-from database import engine, Base
 from config import settings
-from routes import users, admin, tournaments, messages, matches
-from auth import get_password_hash
-from models import User, UserRole
+from routes import users, admin, tournaments, messages, matches, leaderboard, uploads
+from bootstrap import run_bootstrap
+from invalidation import start_invalidation_listener
+from revocation import load_revocations
+from jobs import start_workers, stop_workers
+from uploads import PublicStaticFiles
+from ratelimit import RateLimitMiddleware
+from replica import ReadYourWritesMiddleware
+from database import UnitOfWorkMiddleware
+from profiling import ProfilingMiddleware
+from loop_monitor import LoopLagMiddleware, start_loop_monitor, stop_loop_monitor
 
 # Créer les tables au démarrage
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    # Tables, index et admin : sous verrou, un seul worker à la fois
+    # (désactivable si `python init_db.py` est lancé avant les workers)
+    if settings.RUN_BOOTSTRAP_ON_STARTUP:
+        run_bootstrap()
     
-    # Créer l'admin par défaut s'il n'existe pas
-    from database import SessionLocal
-    db = SessionLocal()
-    try:
-        admin_user = db.query(User).filter(User.email == settings.ADMIN_EMAIL).first()
-        if not admin_user:
-            admin_user = User(
-                email=settings.ADMIN_EMAIL,
-                username="admin",
-                full_name="Administrateur",
-                hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
-                role=UserRole.ADMIN,
-                is_active=True,
-                is_verified=True
-            )
-            db.add(admin_user)
-            db.commit()
-    finally:
-        db.close()
+    # Révocations de tokens (vérifiées en mémoire à chaque requête)
+    load_revocations()
+    
+    # Invalidation des caches entre workers
+    invalidation_task = start_invalidation_listener()
+    
+    # Workers de la file de jobs (les jobs interrompus au dernier arrêt sont repris)
+    start_workers()
+    
+    # Retard de la boucle d'événements (appels bloquants dans les handlers async)
+    loop_monitor_task = start_loop_monitor()
     
     yield
     
     # Shutdown
-    pass
+    stop_loop_monitor(loop_monitor_task)
+    stop_workers()
+    if invalidation_task:
+        invalidation_task.cancel()
 
 app = FastAPI(
     title="eFootball Mobile 2026 Tournament Platform",
@@ -49,6 +53,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Un seul commit par requête, juste avant la réponse (middleware le plus interne)
+app.add_middleware(UnitOfWorkMiddleware)
+
+# Limitation de débit (login/inscription) : rejet avant tout hachage bcrypt
+app.add_middleware(RateLimitMiddleware)
+
+# Lecture de ses propres écritures quand une réplique est configurée
+app.add_middleware(ReadYourWritesMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -58,16 +71,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Requête en cours par tâche, pour attribuer les blocages de la boucle
+app.add_middleware(LoopLagMiddleware)
+
+# Profilage à la demande des administrateurs (middleware le plus externe : couvre toute la pile)
+app.add_middleware(ProfilingMiddleware)
+
 # Router les routes API
 app.include_router(users.router)
 app.include_router(admin.router)
 app.include_router(tournaments.router)
 app.include_router(messages.router)
 app.include_router(matches.router)
+app.include_router(leaderboard.router)
+app.include_router(uploads.router)
 
-# Servir les fichiers statiques
+# Servir les fichiers statiques (sauf les uploads, servis par /api/uploads avec contrôle d'accès)
 if os.path.exists("static"):
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    app.mount("/static", PublicStaticFiles(directory="static", hidden_dir=settings.UPLOAD_DIR), name="static")
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -29,6 +29,26 @@ class RoundType(str, enum.Enum):
     SEMIFINAL = "semifinal"
     FINAL = "final"
     THIRD_PLACE = "third_place"
+    SWISS = "swiss"
+    ROUND_ROBIN = "round_robin"
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class TournamentFormat(str, enum.Enum):
+    SINGLE_ELIMINATION = "single_elimination"
+    SWISS = "swiss"
+    ROUND_ROBIN = "round_robin"
+
+
+class SeedingMode(str, enum.Enum):
+    REGISTRATION = "registration"  # Ordre d'inscription
+    RATING = "rating"  # Têtes de série selon la cote Elo
 
 
 class User(Base):
@@ -55,7 +75,7 @@ class User(Base):
     last_login = Column(DateTime(timezone=True), nullable=True)
     
     # Relations
-    registrations = relationship("TournamentRegistration", back_populates="user")
+    registrations = relationship("TournamentRegistration", foreign_keys="TournamentRegistration.user_id", back_populates="user")
     matches_player1 = relationship("Match", foreign_keys="Match.player1_id", back_populates="player1")
     matches_player2 = relationship("Match", foreign_keys="Match.player2_id", back_populates="player2")
 
@@ -69,8 +89,13 @@ class Tournament(Base):
     registration_fee = Column(Float, nullable=False, default=0.0)
     max_participants = Column(Integer, nullable=False)
     current_participants = Column(Integer, default=0, nullable=False)
+    format = Column(SQLEnum(TournamentFormat), default=TournamentFormat.SINGLE_ELIMINATION, nullable=False)
+    group_size = Column(Integer, nullable=True)  # Round-robin : taille des poules (NULL = poule unique)
+    swiss_rounds = Column(Integer, nullable=True)  # Système suisse : nombre de rondes prévu
+    seeding = Column(SQLEnum(SeedingMode), default=SeedingMode.REGISTRATION, nullable=False)  # Élimination directe
     is_active = Column(Boolean, default=True, nullable=False)
     is_started = Column(Boolean, default=False, nullable=False)
+    change_version = Column(Integer, default=0, nullable=False)  # Dernière version attribuée à ses matchs
     start_date = Column(DateTime(timezone=True), nullable=True)
     end_date = Column(DateTime(timezone=True), nullable=True)
     
@@ -99,7 +124,7 @@ class TournamentRegistration(Base):
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     
     # Relations
-    user = relationship("User", back_populates="registrations")
+    user = relationship("User", foreign_keys=[user_id], back_populates="registrations")
     tournament = relationship("Tournament", back_populates="registrations")
 
 
@@ -111,6 +136,7 @@ class Match(Base):
     round_type = Column(SQLEnum(RoundType), nullable=False)
     round_number = Column(Integer, nullable=False)
     match_number = Column(Integer, nullable=False)
+    group_number = Column(Integer, nullable=True)  # Poule (round-robin uniquement)
     
     player1_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     player2_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -123,6 +149,7 @@ class Match(Base):
     
     is_manually_set = Column(Boolean, default=False, nullable=False)
     notes = Column(Text, nullable=True)
+    change_version = Column(Integer, default=0, nullable=False)  # Version du tournoi lors du dernier changement
     
     scheduled_at = Column(DateTime(timezone=True), nullable=True)
     played_at = Column(DateTime(timezone=True), nullable=True)
@@ -133,6 +160,27 @@ class Match(Base):
     tournament = relationship("Tournament", back_populates="matches")
     player1 = relationship("User", foreign_keys=[player1_id], back_populates="matches_player1")
     player2 = relationship("User", foreign_keys=[player2_id], back_populates="matches_player2")
+    
+    __table_args__ = (
+        # Synchronisation incrémentale : matchs d'un tournoi modifiés après un curseur
+        Index("ix_matches_tournament_change", "tournament_id", "change_version"),
+        # Matchs d'un joueur : une branche par côté (UNION ALL), voir player_matches.py
+        Index("ix_matches_player1_status", "player1_id", "status", "played_at"),
+        Index("ix_matches_player2_status", "player2_id", "status", "played_at"),
+    )
+
+
+class MatchTombstone(Base):
+    __tablename__ = "match_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tournament_id = Column(Integer, nullable=False)
+    match_id = Column(Integer, nullable=False)  # Match supprimé (régénération du tableau)
+    change_version = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_match_tombstones_tournament_change", "tournament_id", "change_version"),
+    )
 
 
 class Bracket(Base):
@@ -154,6 +202,20 @@ class Bracket(Base):
     tournament = relationship("Tournament", back_populates="brackets")
 
 
+class TournamentSchedule(Base):
+    __tablename__ = "tournament_schedules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tournament_id = Column(Integer, ForeignKey("tournaments.id"), unique=True, nullable=False)
+    windows = Column(Text, nullable=False)  # JSON : [[début, fin], ...] en UTC
+    match_duration_minutes = Column(Integer, nullable=False)
+    min_rest_minutes = Column(Integer, default=0, nullable=False)
+    max_concurrent_matches = Column(Integer, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+
 class AdminMessage(Base):
     __tablename__ = "admin_messages"
 
@@ -162,6 +224,7 @@ class AdminMessage(Base):
     content = Column(Text, nullable=False)
     is_important = Column(Boolean, default=False, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    change_version = Column(Integer, default=0, nullable=False, index=True)  # Synchronisation incrémentale
     
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -177,5 +240,110 @@ class ActivityLog(Base):
     details = Column(Text, nullable=True)
     ip_address = Column(String, nullable=True)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+
+
+class PlayerStats(Base):
+    __tablename__ = "player_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    tournament_id = Column(Integer, ForeignKey("tournaments.id"), nullable=True)  # NULL = statistiques globales
+    
+    played = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    draws = Column(Integer, default=0, nullable=False)
+    losses = Column(Integer, default=0, nullable=False)
+    goals_for = Column(Integer, default=0, nullable=False)
+    goals_against = Column(Integer, default=0, nullable=False)
+    goal_difference = Column(Integer, default=0, nullable=False)
+    titles = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+    
+    # Relations
+    user = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_player_stats_user_tournament", "user_id", "tournament_id", unique=True),
+        # Une seule ligne globale par joueur (les NULL sont distincts dans l'index précédent)
+        Index(
+            "ix_player_stats_global_user", "user_id", unique=True,
+            sqlite_where=tournament_id.is_(None), postgresql_where=tournament_id.is_(None)
+        ),
+        # Classement : lecture dans l'ordre de l'index, sans tri
+        Index("ix_player_stats_ranking", "tournament_id", "wins", "goal_difference", "goals_for"),
+    )
+
+
+class PlayerRating(Base):
+    __tablename__ = "player_ratings"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    rating = Column(Float, nullable=False)  # Cote Elo
+    matches_rated = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    key = Column(String, primary_key=True)  # Clé invalidée (ex : "leaderboard")
+    version = Column(Integer, default=0, nullable=False)
+
+
+class SchemaInfo(Base):
+    __tablename__ = "schema_info"
 
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String, nullable=False)  # Empreinte du schéma déjà initialisé
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=True)
+
+
+class TokenRevocation(Base):
+    __tablename__ = "token_revocations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, nullable=True, index=True)  # Un token précis (déconnexion)
+    user_id = Column(Integer, nullable=True, index=True)  # Tous les tokens émis avant revoked_at
+    token_type = Column(String, nullable=True)  # "access" : refresh tokens épargnés ; NULL : tous
+    revoked_at = Column(Float, nullable=False)  # Timestamp, comparé au claim iat
+    expires_at = Column(DateTime, nullable=False)  # Au-delà, les tokens concernés ont expiré
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)  # Route, portée (ip/account) et valeur
+    tat = Column(Float, nullable=False)  # Heure d'arrivée théorique (GCRA), timestamp
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # Nom du handler enregistré (ex : "start_tournament")
+    payload = Column(Text, nullable=False)  # Paramètres JSON
+    dedupe_key = Column(String, nullable=True, index=True)  # Un seul job actif par clé
+    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime, nullable=False)  # Pas avant (délai de réessai)
+    locked_by = Column(String, nullable=True)  # Worker qui exécute le job
+    locked_until = Column(DateTime, nullable=True)  # Bail : au-delà, un autre worker peut reprendre le job
+    progress = Column(Float, default=0.0, nullable=False)  # 0 à 1
+    progress_message = Column(String, nullable=True)
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Réclamation : jobs prêts par ordre d'arrivée
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
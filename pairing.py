@@ -0,0 +1,139 @@
+"""
+Moteur d'appariement pour les formats système suisse et round-robin
+Fonctions pures (aucun accès base) : elles reçoivent des identifiants de joueurs
+et renvoient des paires (player1_id, player2_id)
+"""
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+Pair = Tuple[int, int]
+
+# Au-delà, on renonce à éviter les revanches plutôt que d'explorer davantage
+SWISS_SEARCH_BUDGET = 200000
+
+
+def split_into_groups(player_ids: Sequence[int], group_size: int) -> List[List[int]]:
+    """Répartir les joueurs (ordonnés par tête de série) en poules équilibrées, en serpentin"""
+    group_count = max(1, -(-len(player_ids) // group_size))
+    groups = [[] for _ in range(group_count)]
+    for index, player_id in enumerate(player_ids):
+        lap, offset = divmod(index, group_count)
+        groups[offset if lap % 2 == 0 else group_count - 1 - offset].append(player_id)
+    return groups
+
+
+def round_robin_rounds(player_ids: Sequence[int]) -> List[List[Pair]]:
+    """Calendrier complet par la méthode du cercle : chaque joueur rencontre tous les autres une fois"""
+    players: List[Optional[int]] = list(player_ids)
+    if len(players) % 2:
+        players.append(None)  # Exempt
+    n = len(players)
+    rounds = []
+    for round_index in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            home, away = players[i], players[n - 1 - i]
+            if home is None or away is None:
+                continue
+            # Alternance domicile/extérieur d'une ronde à l'autre
+            if (i == 0 and round_index % 2) or (i > 0 and i % 2):
+                home, away = away, home
+            pairs.append((home, away))
+        rounds.append(pairs)
+        # Le premier joueur reste fixe, les autres tournent d'un cran
+        players = [players[0], players[-1]] + players[1:-1]
+    return rounds
+
+
+def _candidates(pool: List[int], points: Dict[int, int]) -> List[int]:
+    """Adversaires possibles pour pool[0], par ordre de préférence
+
+    Dans le groupe de score, le joueur du haut affronte d'abord celui situé
+    une demi-groupe plus bas ; viennent ensuite le reste du groupe puis les
+    groupes inférieurs (flotteurs).
+    """
+    top_points = points.get(pool[0], 0)
+    group_end = 1
+    while group_end < len(pool) and points.get(pool[group_end], 0) == top_points:
+        group_end += 1
+    group = pool[1:group_end]
+    half = len(pool[:group_end]) // 2
+    start = max(half - 1, 0)
+    return group[start:] + group[:start] + pool[group_end:]
+
+
+def _pair_without_rematches(players: List[int], points: Dict[int, int], played: Set[FrozenSet[int]]) -> Optional[List[Pair]]:
+    """Appariement avec retour arrière ; None si impossible dans le budget"""
+    if not players:
+        return []
+    frames = [[players, _candidates(players, points), 0]]
+    pairs: List[Pair] = []
+    steps = 0
+    while frames:
+        pool, candidates, index = frames[-1]
+        top = pool[0]
+        while index < len(candidates) and frozenset((top, candidates[index])) in played:
+            index += 1
+        if index == len(candidates):
+            # Impasse : défaire la paire précédente et essayer le candidat suivant
+            frames.pop()
+            if not frames:
+                return None
+            pairs.pop()
+            frames[-1][2] += 1
+            continue
+
+        frames[-1][2] = index
+        opponent = candidates[index]
+        pairs.append((top, opponent))
+        rest = [player_id for player_id in pool[1:] if player_id != opponent]
+        if not rest:
+            return pairs
+        frames.append([rest, _candidates(rest, points), 0])
+
+        steps += 1
+        if steps > SWISS_SEARCH_BUDGET:
+            return None
+    return None
+
+
+def _assign_colors(first: int, second: int, color_balance: Dict[int, int]) -> Pair:
+    """Donner la place de player1 à celui qui l'a eue le moins souvent"""
+    if color_balance.get(second, 0) < color_balance.get(first, 0):
+        return second, first
+    return first, second
+
+
+def swiss_pairings(
+    ranking: Sequence[int],
+    points: Dict[int, int],
+    played: Set[FrozenSet[int]],
+    color_balance: Dict[int, int],
+    had_bye: Set[int]
+) -> Tuple[List[Pair], Optional[int]]:
+    """Apparier une ronde suisse
+
+    ranking : joueurs du mieux classé au moins bien classé
+    points : points de chaque joueur
+    played : paires déjà jouées (frozenset), pour éviter les revanches
+    color_balance : nombre de fois player1 moins nombre de fois player2
+    had_bye : joueurs ayant déjà été exemptés
+    Retourne les paires et le joueur exempté (None si nombre pair).
+    """
+    players = list(ranking)
+    bye = None
+    if len(players) % 2:
+        # Exempt : le moins bien classé qui ne l'a pas encore été
+        bye = next((player_id for player_id in reversed(players) if player_id not in had_bye), players[-1])
+        players.remove(bye)
+
+    pairs = _pair_without_rematches(players, points, played)
+    if pairs is None:
+        # Dernier recours : appariement glouton, revanches autorisées
+        pairs = []
+        pool = players
+        while pool:
+            opponent = _candidates(pool, points)[0]
+            pairs.append((pool[0], opponent))
+            pool = [player_id for player_id in pool[1:] if player_id != opponent]
+
+    return [_assign_colors(first, second, color_balance) for first, second in pairs], bye
@@ -0,0 +1,93 @@
+"""
+Matchs d'un joueur (historique paginé, prochain match) tous tournois confondus
+Un joueur peut être player1 ou player2 : « player1_id = ? OR player2_id = ? »
+ne peut utiliser qu'un parcours complet de la table. Chaque côté est donc une
+branche qui suit son index (player1_id, status, played_at) ou (player2_id,
+status, played_at), et les deux branches sont réunies par UNION ALL, triée
+et paginée au niveau de l'union : SQLite fusionne les deux index déjà triés
+(MERGE) et s'arrête à la fin de la page, sans trier tous les matchs du
+joueur. Le tournoi et l'adversaire ne sont lus que pour les lignes renvoyées
+"""
+from typing import List, Optional
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+from models import Match, MatchStatus, Tournament, User
+
+PLAYER_MATCH_COLUMNS = (
+    Match.id, Match.tournament_id, Match.round_type, Match.round_number, Match.match_number,
+    Match.group_number, Match.player1_id, Match.player2_id, Match.player1_score, Match.player2_score,
+    Match.winner_id, Match.status, Match.scheduled_at, Match.played_at
+)
+
+
+def _player_branches(user_id: int, match_status: MatchStatus, sort_key):
+    """Une branche par côté du match ; l'adversaire est l'autre côté"""
+    return union_all(
+        select(Match.id, Match.player2_id.label("opponent_id"), sort_key.label("sort_key"))
+        .where(Match.player1_id == user_id, Match.status == match_status),
+        select(Match.id, Match.player1_id.label("opponent_id"), sort_key.label("sort_key"))
+        .where(Match.player2_id == user_id, Match.status == match_status)
+    )
+
+
+def _with_details(db: Session, page, order_by) -> List[dict]:
+    opponent = User.__table__.alias("opponent")
+    rows = db.execute(
+        select(
+            *PLAYER_MATCH_COLUMNS, Tournament.name.label("tournament_name"),
+            opponent.c.id.label("opponent__id"), opponent.c.username.label("opponent__username"),
+            opponent.c.full_name.label("opponent__full_name"),
+            opponent.c.profile_picture.label("opponent__profile_picture")
+        )
+        .select_from(page)
+        .join(Match, Match.id == page.c.id)
+        .join(Tournament, Tournament.id == Match.tournament_id)
+        .outerjoin(opponent, opponent.c.id == page.c.opponent_id)
+        .order_by(*order_by)
+    ).mappings()
+
+    matches = []
+    for row in rows:
+        match = dict(row)
+        player = {field: match.pop(f"opponent__{field}") for field in ("id", "username", "full_name", "profile_picture")}
+        match["opponent"] = player if player["id"] is not None else None
+        matches.append(match)
+    return matches
+
+
+def player_match_history(
+    db: Session, user_id: int, skip: int = 0, limit: int = 20, match_status: MatchStatus = MatchStatus.PLAYED
+) -> List[dict]:
+    """Matchs du joueur, les plus récents en tête
+
+    Matchs joués : par date de score (index), ceux d'avant played_at en dernier.
+    Autres statuts (peu de lignes) : par date prévue, sinon de création.
+    """
+    if match_status == MatchStatus.PLAYED:
+        sort_key = Match.played_at
+    else:
+        sort_key = func.coalesce(Match.scheduled_at, Match.created_at)
+    matches = _player_branches(user_id, match_status, sort_key)
+    page = (
+        matches
+        .order_by(matches.selected_columns.sort_key.desc().nulls_last(), matches.selected_columns.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    return _with_details(db, page, (page.c.sort_key.desc().nulls_last(), page.c.id.desc()))
+
+
+def next_player_match(db: Session, user_id: int) -> Optional[dict]:
+    """Prochain match en attente du joueur : le plus tôt planifié, sinon le plus ancien créé"""
+    matches = _player_branches(user_id, MatchStatus.PENDING, Match.scheduled_at)
+    page = (
+        matches
+        .order_by(matches.selected_columns.sort_key.asc().nulls_last(), matches.selected_columns.id)
+        .limit(1)
+        .subquery()
+    )
+    found = _with_details(db, page, (page.c.id,))
+    return found[0] if found else None
@@ -0,0 +1,139 @@
+"""
+Statistiques des joueurs maintenues de façon incrémentale
+Chaque score saisi ajoute sa contribution aux lignes PlayerStats du joueur
+(globale et par tournoi) ; une correction retire d'abord l'ancienne contribution.
+Une seule ligne par joueur et portée : index unique (user_id, tournament_id)
+pour les tournois, index unique partiel sur user_id pour la ligne globale
+(tournament_id NULL, que l'index composite ne déduplique pas)
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import desc, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+from models import Match, MatchStatus, PlayerStats, RoundType
+
+STAT_FIELDS = ("played", "wins", "draws", "losses", "goals_for", "goals_against", "goal_difference", "titles")
+
+# Colonnes lues par match_contribution (lignes Core sans charger d'objets Match)
+PLAYED_MATCH_COLUMNS = (
+    Match.status, Match.round_type, Match.player1_id, Match.player2_id,
+    Match.player1_score, Match.player2_score, Match.winner_id
+)
+
+
+def match_contribution(match: Match) -> Dict[int, Dict[str, int]]:
+    """Contribution d'un match joué aux statistiques de chaque joueur"""
+    # Exempt du système suisse : victoire sans but pour le joueur seul (points de la ronde).
+    # Exempt du premier tour d'une élimination directe : simple qualification, aucun match joué
+    if match.status == MatchStatus.PLAYED and match.player2_id is None and match.winner_id is not None:
+        return {match.winner_id: {"played": 1, "wins": 1}} if match.round_type == RoundType.SWISS else {}
+
+    if (
+        match.status != MatchStatus.PLAYED
+        or match.player1_id is None or match.player2_id is None
+        or match.player1_score is None or match.player2_score is None
+    ):
+        return {}
+
+    contribution = {}
+    sides = (
+        (match.player1_id, match.player1_score, match.player2_score),
+        (match.player2_id, match.player2_score, match.player1_score),
+    )
+    for user_id, scored, conceded in sides:
+        contribution[user_id] = {
+            "played": 1,
+            "wins": int(scored > conceded),
+            "draws": int(scored == conceded),
+            "losses": int(scored < conceded),
+            "goals_for": scored,
+            "goals_against": conceded,
+            "goal_difference": scored - conceded,
+            "titles": int(match.round_type == RoundType.FINAL and match.winner_id == user_id),
+        }
+    return contribution
+
+
+def _apply(db: Session, user_id: int, tournament_id: Optional[int], deltas: Dict[str, int], sign: int):
+    query = db.query(PlayerStats).filter(
+        PlayerStats.user_id == user_id,
+        PlayerStats.tournament_id.is_(None) if tournament_id is None else PlayerStats.tournament_id == tournament_id
+    )
+    if query.first() is None:
+        try:
+            with db.begin_nested():
+                db.add(PlayerStats(user_id=user_id, tournament_id=tournament_id, **{field: 0 for field in STAT_FIELDS}))
+        except IntegrityError:
+            # Ligne créée entre-temps par une saisie concurrente : l'index unique refuse le doublon
+            pass
+
+    # Incrément côté SQL : pas de lecture-modification-écriture concurrente
+    query.update(
+        {getattr(PlayerStats, field): getattr(PlayerStats, field) + sign * value for field, value in deltas.items()},
+        synchronize_session=False
+    )
+
+
+def apply_contribution(db: Session, tournament_id: int, contribution: Dict[int, Dict[str, int]], sign: int = 1):
+    """Ajouter (sign=1) ou retirer (sign=-1) une contribution aux statistiques globales et du tournoi"""
+    for user_id, deltas in contribution.items():
+        _apply(db, user_id, None, deltas, sign)
+        _apply(db, user_id, tournament_id, deltas, sign)
+
+
+def get_leaderboard(db: Session, tournament_id: Optional[int] = None, skip: int = 0, limit: int = 50) -> List[PlayerStats]:
+    """Classement lu directement dans l'ordre de l'index ix_player_stats_ranking"""
+    query = db.query(PlayerStats).options(joinedload(PlayerStats.user))
+    if tournament_id is None:
+        query = query.filter(PlayerStats.tournament_id.is_(None))
+    else:
+        query = query.filter(PlayerStats.tournament_id == tournament_id)
+    return query.order_by(
+        desc(PlayerStats.wins), desc(PlayerStats.goal_difference), desc(PlayerStats.goals_for)
+    ).offset(skip).limit(limit).all()
+
+
+def rebuild_player_stats(db: Session) -> int:
+    """Recalculer toutes les statistiques depuis l'historique des matchs"""
+    db.query(PlayerStats).delete()
+    totals = {}
+    for match in db.query(Match).filter(Match.status == MatchStatus.PLAYED).yield_per(1000):
+        for user_id, deltas in match_contribution(match).items():
+            for key in ((user_id, None), (user_id, match.tournament_id)):
+                row = totals.setdefault(key, dict.fromkeys(STAT_FIELDS, 0))
+                for field, value in deltas.items():
+                    row[field] += value
+
+    db.add_all(
+        PlayerStats(user_id=user_id, tournament_id=tournament_id, **values)
+        for (user_id, tournament_id), values in totals.items()
+    )
+    db.commit()
+    return len(totals)
+
+
+def repair_duplicate_stats(db: Session) -> bool:
+    """Recalculer les statistiques si un joueur a plusieurs lignes globales
+
+    Créées avant l'index unique partiel : chaque incrément ultérieur a touché
+    toutes les lignes du joueur, leurs totaux ne sont pas fusionnables.
+    """
+    duplicated = db.query(PlayerStats.user_id).filter(
+        PlayerStats.tournament_id.is_(None)
+    ).group_by(PlayerStats.user_id).having(func.count() > 1).first()
+    if duplicated is None:
+        return False
+    rebuild_player_stats(db)
+    return True
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"{rebuild_player_stats(db)} lignes de statistiques recalculées")
+    finally:
+        db.close()
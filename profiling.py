@@ -0,0 +1,186 @@
+"""
+Profilage à la demande des requêtes (administrateurs uniquement)
+Une requête portant l'en-tête X-Profile: 1 ou le paramètre ?profile=1, avec
+un token administrateur, est profilée par échantillonnage : un thread relève
+la pile du thread de la boucle toutes les PROFILE_SAMPLE_INTERVAL_MS tant que
+la requête est en cours. Un échantillon pris pendant qu'une autre tâche
+tourne (ou que la requête attend une E/S ou le threadpool) est compté comme
+attente. Le profil est renvoyé par son identifiant (en-tête X-Profile-Id) et
+lisible au format « collapsed stacks » (flamegraph.pl, speedscope).
+Le magasin, en mémoire et par worker, garde les PROFILE_STORE_SIZE profils
+les plus lents, plus toujours le dernier.
+Sans drapeau, le middleware ne fait qu'un test sur les en-têtes et la query string
+"""
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Request
+
+from auth import get_current_admin, get_token_user, security
+from config import settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = b"profile=1"
+WAITING_FRAME = "(en attente : E/S, threadpool ou autre requête)"
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_profiles: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4096)
+def frame_label(code) -> str:
+    """fonction (fichier:ligne), chemin relatif au projet ou à site-packages"""
+    filename = code.co_filename
+    if "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    elif filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    # co_qualname (Classe.méthode) n'existe qu'à partir de Python 3.11
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({filename}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    """Échantillonne la pile du thread de la boucle quand la tâche de la requête s'exécute"""
+
+    def __init__(self, thread_id: int, loop, task, root_code):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.loop = loop
+        self.task = task
+        self.root_code = root_code
+        self.stacks: Counter = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        interval = settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        while not self._done.wait(interval):
+            if asyncio.current_task(self.loop) is not self.task:
+                self.stacks[WAITING_FRAME] += 1
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            # Pile coupée au middleware : la boucle d'événements est commune à tous les échantillons
+            while frame is not None:
+                labels.append(frame_label(frame.f_code))
+                if frame.f_code is self.root_code:
+                    break
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> Counter:
+        self._done.set()
+        self.join()
+        return self.stacks
+
+
+def _requested(scope) -> bool:
+    query = scope.get("query_string", b"")
+    if PROFILE_QUERY in query and PROFILE_QUERY in query.split(b"&"):
+        return True
+    return any(name == PROFILE_HEADER and value not in (b"", b"0") for name, value in scope["headers"])
+
+
+async def _is_admin(scope) -> bool:
+    """Même contrôle que la dépendance get_current_admin (token seul, sans accès base)"""
+    request = Request(scope)
+    try:
+        get_current_admin(get_token_user(await security(request), request.cookies.get("session_token")))
+    except HTTPException:
+        return False
+    return True
+
+
+def _store(profile: dict):
+    with _lock:
+        _profiles[profile["id"]] = profile
+        while len(_profiles) > settings.PROFILE_STORE_SIZE:
+            fastest = min(
+                (entry for entry in _profiles.values() if entry["id"] != profile["id"]),
+                key=lambda entry: entry["duration_ms"]
+            )
+            del _profiles[fastest["id"]]
+
+
+def list_profiles() -> List[dict]:
+    """Profils gardés, du plus lent au plus rapide (sans les piles)"""
+    with _lock:
+        entries = list(_profiles.values())
+    return [
+        {key: value for key, value in entry.items() if key != "stacks"}
+        for entry in sorted(entries, key=lambda entry: entry["duration_ms"], reverse=True)
+    ]
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    with _lock:
+        return _profiles.get(profile_id)
+
+
+def collapsed_stacks(profile: dict) -> str:
+    """Une ligne « frame;frame;... nombre » par pile (format collapsed de flamegraph.pl)"""
+    return "".join(f"{stack} {count}\n" for stack, count in profile["stacks"].most_common())
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI : profile les requêtes marquées des administrateurs"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if not await _is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        sampler = _Sampler(
+            threading.get_ident(), asyncio.get_running_loop(), asyncio.current_task(),
+            ProfilingMiddleware.__call__.__code__
+        )
+        response_status = None
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+
+        def finish():
+            stacks = sampler.stop()
+            _store({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": response_status,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "samples": sum(stacks.values()),
+                "created_at": started_at.isoformat(),
+                "stacks": stacks
+            })
+
+        async def send_with_profile(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            elif message["type"] == "http.response.body" and not message.get("more_body", False) and sampler.is_alive():
+                # Profil enregistré avant le dernier envoi : il est lisible dès la réponse reçue
+                finish()
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            if sampler.is_alive():
+                finish()
@@ -0,0 +1,189 @@
+"""
+Limitation de débit (token bucket) pour les routes qui hachent des mots de passe
+Implémentée en GCRA : une seule valeur par clé (l'heure d'arrivée théorique),
+ce qui rend la vérification O(1) et le partage entre workers trivial.
+Le middleware rejette la requête avant que le handler (et bcrypt) ne s'exécute
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from database import SessionLocal
+from models import RateLimitBucket
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Corps JSON lus pour extraire le compte visé (login/register sont de petites requêtes)
+MAX_INSPECTED_BODY = 16 * 1024
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """"5/minute" -> (5, 60.0)"""
+    count, period = rate.split("/")
+    return int(count), float(_PERIODS[period.strip()])
+
+
+class LocalBackend:
+    """Compteurs en mémoire du processus (un seul worker, ou limite par worker)"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.tats: "OrderedDict[str, float]" = OrderedDict()
+
+    def hit(self, key: str, limit: int, period: float, now: float) -> float:
+        """Retourne 0 si la requête passe, sinon le délai d'attente en secondes"""
+        interval = period / limit
+        tat = max(self.tats.get(key, now), now)
+        if tat - now > period - interval:
+            return tat - now - (period - interval)
+        self.tats[key] = tat + interval
+        self.tats.move_to_end(key)
+        if len(self.tats) > self.max_keys:
+            self.tats.popitem(last=False)
+        return 0.0
+
+
+class DatabaseBackend:
+    """Compteurs partagés entre workers, via une mise à jour conditionnelle (compare-and-set)"""
+
+    def hit(self, key: str, limit: int, period: float, now: float) -> float:
+        interval = period / limit
+        db = SessionLocal()
+        try:
+            for _ in range(5):
+                stored = db.execute(select(RateLimitBucket.tat).where(RateLimitBucket.key == key)).scalar()
+                tat = max(stored if stored is not None else now, now)
+                if tat - now > period - interval:
+                    db.rollback()
+                    return tat - now - (period - interval)
+                try:
+                    if stored is None:
+                        db.execute(insert(RateLimitBucket).values(key=key, tat=tat + interval))
+                    else:
+                        result = db.execute(
+                            update(RateLimitBucket)
+                            .where(RateLimitBucket.key == key, RateLimitBucket.tat == stored)
+                            .values(tat=tat + interval)
+                        )
+                        if result.rowcount == 0:
+                            db.rollback()
+                            continue
+                    db.commit()
+                    return 0.0
+                except IntegrityError:
+                    db.rollback()
+            # Contention persistante sur la même clé : c'est déjà une rafale
+            return interval
+        finally:
+            db.close()
+
+
+def _rules() -> Dict[Tuple[str, str], List[Tuple[str, int, float]]]:
+    return {
+        ("POST", "/api/users/login"): [
+            ("ip", *parse_rate(settings.RATE_LIMIT_LOGIN_PER_IP)),
+            ("account", *parse_rate(settings.RATE_LIMIT_LOGIN_PER_ACCOUNT)),
+        ],
+        ("POST", "/api/users/register"): [
+            ("ip", *parse_rate(settings.RATE_LIMIT_REGISTER_PER_IP)),
+            ("account", *parse_rate(settings.RATE_LIMIT_REGISTER_PER_ACCOUNT)),
+        ],
+    }
+
+
+def _client_ip(scope) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        # Chaque proxy ajoute à droite l'adresse qui l'a contacté : seules les
+        # RATE_LIMIT_FORWARDED_HOPS dernières entrées sont fiables, celles de
+        # gauche viennent du client et changeraient de compteur à volonté
+        forwarded = [
+            entry.strip()
+            for name, value in scope.get("headers", []) if name == b"x-forwarded-for"
+            for entry in value.decode("latin-1").split(",")
+        ]
+        hops = settings.RATE_LIMIT_FORWARDED_HOPS
+        if hops > 0 and len(forwarded) >= hops:
+            return forwarded[-hops]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _account(body: bytes) -> Optional[str]:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    email = data.get("email") if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI : une recherche dans un dict pour les routes non limitées"""
+
+    def __init__(self, app):
+        self.app = app
+        self.rules = _rules()
+        self.backend = DatabaseBackend() if settings.RATE_LIMIT_BACKEND == "db" else LocalBackend()
+
+    async def __call__(self, scope, receive, send):
+        rules = self.rules.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if not rules or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        # Lire le corps pour connaître le compte visé, puis le rejouer au handler
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more_body = message.get("more_body", False) and size <= MAX_INSPECTED_BODY
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": more_body}
+            return await receive()
+
+        keys = {"ip": _client_ip(scope), "account": _account(body)}
+        now = time.time()
+        for scope_name, limit, period in rules:
+            if keys[scope_name] is None:
+                continue
+            key = f"{scope['path']}:{scope_name}:{keys[scope_name]}"
+            if isinstance(self.backend, LocalBackend):
+                retry_after = self.backend.hit(key, limit, period, now)
+            else:
+                retry_after = await run_in_threadpool(self.backend.hit, key, limit, period, now)
+            if retry_after > 0:
+                await self._reject(send, retry_after)
+                return
+
+        await self.app(scope, replay, send)
+
+    @staticmethod
+    async def _reject(send, retry_after: float):
+        body = json.dumps({"detail": "Trop de tentatives, réessayez plus tard"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
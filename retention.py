@@ -0,0 +1,137 @@
+"""
+Rétention des logs d'activité
+Archive les logs plus anciens que ACTIVITY_LOG_RETENTION_DAYS dans des fichiers
+gzip JSONL (un par jour, en ajout uniquement) puis les supprime par lots
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import ActivityLog
+
+ARCHIVE_PREFIX = "activity_logs-"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+_COLUMNS = (
+    ActivityLog.id,
+    ActivityLog.user_id,
+    ActivityLog.action,
+    ActivityLog.details,
+    ActivityLog.ip_address,
+    ActivityLog.created_at,
+)
+
+
+def archive_path(day: date) -> str:
+    """Chemin du fichier d'archive pour un jour donné"""
+    return os.path.join(settings.ACTIVITY_LOG_ARCHIVE_DIR, f"{ARCHIVE_PREFIX}{day.isoformat()}{ARCHIVE_SUFFIX}")
+
+
+def _row_to_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "action": row.action,
+        "details": row.details,
+        "ip_address": row.ip_address,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def _append_to_archives(rows) -> List[str]:
+    """Ajouter des lignes aux archives journalières (un membre gzip par appel)"""
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(row.created_at.date(), []).append(row)
+
+    written = []
+    for day, day_rows in sorted(by_day.items()):
+        path = archive_path(day)
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                for row in day_rows:
+                    gz.write(json.dumps(_row_to_dict(row), ensure_ascii=False).encode("utf-8") + b"\n")
+            raw.flush()
+            # Les lignes doivent être sur disque avant d'être supprimées de la base
+            os.fsync(raw.fileno())
+        written.append(path)
+    return written
+
+
+def archive_activity_logs(
+    db: Session,
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> dict:
+    """Archiver puis supprimer les logs plus anciens que la période de rétention"""
+    if retention_days is None:
+        retention_days = settings.ACTIVITY_LOG_RETENTION_DAYS
+    if batch_size is None:
+        batch_size = settings.ACTIVITY_LOG_PURGE_BATCH_SIZE
+
+    os.makedirs(settings.ACTIVITY_LOG_ARCHIVE_DIR, exist_ok=True)
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+
+    archived = 0
+    files = set()
+    while True:
+        # Lot borné : chaque transaction ne verrouille qu'au plus batch_size lignes
+        rows = db.execute(
+            select(*_COLUMNS)
+            .where(ActivityLog.created_at < cutoff)
+            .order_by(ActivityLog.created_at, ActivityLog.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        files.update(_append_to_archives(rows))
+        db.execute(
+            delete(ActivityLog)
+            .where(ActivityLog.id.in_([row.id for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        archived += len(rows)
+
+        if len(rows) < batch_size:
+            break
+
+    return {"archived": archived, "cutoff": cutoff.isoformat(), "files": sorted(files)}
+
+
+def iter_archived_logs(start_date: date, end_date: date) -> Iterator[dict]:
+    """Parcourir les logs archivés entre deux dates incluses, dans l'ordre chronologique"""
+    day = start_date
+    while day <= end_date:
+        path = archive_path(day)
+        if os.path.exists(path):
+            # Un archivage interrompu avant la suppression peut réécrire des lignes déjà archivées
+            seen = set()
+            with gzip.open(path, "rb") as gz:
+                for line in gz:
+                    entry = json.loads(line)
+                    if entry["id"] in seen:
+                        continue
+                    seen.add(entry["id"])
+                    yield entry
+        day += timedelta(days=1)
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = archive_activity_logs(db)
+        print(f"{result['archived']} logs archivés (antérieurs au {result['cutoff']})")
+        for path in result["files"]:
+            print(f"  {path}")
+    finally:
+        db.close()
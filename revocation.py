@@ -0,0 +1,87 @@
+"""
+Ensemble des tokens révoqués, gardé en mémoire pour une vérification en O(1)
+Les révocations sont écrites dans token_revocations ; chaque worker recharge
+l'ensemble quand la clé d'invalidation "token_revocations" change
+(immédiatement pour le worker qui révoque, au prochain poll pour les autres)
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+from invalidation import bump, subscribe
+from models import TokenRevocation
+
+INVALIDATION_KEY = "token_revocations"
+
+_revoked_jtis: Dict[str, datetime] = {}
+# Par type de token ("access", "refresh") : user_id -> horodatage de révocation
+_revoked_users: Dict[str, Dict[int, float]] = {"access": {}, "refresh": {}}
+
+
+def is_revoked(payload: dict) -> bool:
+    """Le token (claims décodés) a-t-il été révoqué ?"""
+    if payload.get("jti") in _revoked_jtis:
+        return True
+    revoked_at = _revoked_users.get(payload.get("type"), {}).get(int(payload["sub"]))
+    return revoked_at is not None and payload.get("iat", 0) <= revoked_at
+
+
+def revoke_token(db: Session, jti: str, expires_at: datetime):
+    """Révoquer un token précis (effectif au commit de db)"""
+    db.add(TokenRevocation(jti=jti, revoked_at=time.time(), expires_at=expires_at))
+    bump(db, INVALIDATION_KEY)
+
+
+def revoke_user(db: Session, user_id: int, keep_refresh_tokens: bool = False):
+    """Révoquer les tokens déjà émis pour un utilisateur (effectif au commit de db)
+
+    keep_refresh_tokens : seuls les access tokens sont révoqués ; l'utilisateur
+    obtient de nouveaux claims au prochain refresh sans se reconnecter.
+    """
+    # Passé la durée de vie d'un refresh token, plus aucun token antérieur n'est valide
+    expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(TokenRevocation(
+        user_id=user_id,
+        token_type="access" if keep_refresh_tokens else None,
+        revoked_at=time.time(),
+        expires_at=expires_at
+    ))
+    db.execute(delete(TokenRevocation).where(TokenRevocation.expires_at < datetime.utcnow()))
+    bump(db, INVALIDATION_KEY)
+
+
+def load_revocations(*_):
+    """Recharger les révocations encore utiles"""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                TokenRevocation.jti, TokenRevocation.user_id, TokenRevocation.token_type,
+                TokenRevocation.revoked_at, TokenRevocation.expires_at
+            )
+            .where(TokenRevocation.expires_at >= datetime.utcnow())
+        ).all()
+    finally:
+        db.close()
+
+    jtis = {}
+    users = {"access": {}, "refresh": {}}
+    for row in rows:
+        if row.jti:
+            jtis[row.jti] = row.expires_at
+        if row.user_id is not None:
+            for token_type in ((row.token_type,) if row.token_type else ("access", "refresh")):
+                revoked = users[token_type]
+                revoked[row.user_id] = max(revoked.get(row.user_id, 0.0), row.revoked_at)
+
+    # Remplacement en bloc : les lecteurs voient l'ancien ou le nouvel ensemble, jamais un mélange
+    global _revoked_jtis, _revoked_users
+    _revoked_jtis, _revoked_users = jtis, users
+
+
+subscribe(INVALIDATION_KEY, load_revocations)
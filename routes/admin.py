@@ -1,23 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, date
+import json
 
 from database import get_db
 from models import (
-    User, Tournament, TournamentRegistration, Match, Bracket,
-    ActivityLog, AdminMessage, RegistrationStatus, UserRole
+    User, Tournament, Match, Bracket,
+    ActivityLog, AdminMessage, RegistrationStatus, UserRole, Job, JobStatus
 )
 from schemas import (
     UserResponse, TournamentCreate, TournamentResponse,
-    RegistrationResponse, MatchResponse, AdminMessageCreate, AdminMessageResponse
+    RegistrationResponse, MatchResponse, AdminMessageCreate, AdminMessageResponse,
+    AdminSummaryResponse, JobResponse
 )
 from auth import get_current_admin
+from retention import archive_activity_logs, iter_archived_logs
+from exports import EXPORT_DATASETS, EXPORT_FORMATS, stream_export
+from search import search_users, unindex_user
+from revocation import revoke_user
+from dashboard import get_admin_summary
+from ratings import schedule_recompute
+from listings import list_users, list_registrations, json_response
+from profiling import list_profiles, get_profile, collapsed_stacks
+from loop_monitor import loop_lag_metrics, recent_stalls
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
 
+@router.get("/summary", response_model=AdminSummaryResponse)
+async def get_summary(
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Compteurs du tableau de bord (agrégats SQL, mis en cache quelques secondes)"""
+    return get_admin_summary(db)
+
+
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
     skip: int = 0,
@@ -27,13 +48,20 @@ async def get_all_users(
     db: Session = Depends(get_db)
 ):
     """Obtenir tous les utilisateurs"""
-    query = db.query(User)
-    
-    if status_filter:
-        query = query.filter(User.registration_status == status_filter)
-    
-    users = query.order_by(desc(User.created_at)).offset(skip).limit(limit).all()
-    return users
+    return json_response(list_users(db, skip, limit, status_filter))
+
+
+@router.get("/users/search", response_model=List[UserResponse])
+async def search_players(
+    q: str,
+    limit: int = 20,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Rechercher des joueurs (username, email, nom, téléphone)"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Requête vide")
+    return search_users(db, q, limit=min(max(limit, 1), 100))
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -62,7 +90,6 @@ async def approve_user(
     
     user.registration_status = RegistrationStatus.APPROVED
     user.is_verified = True
-    db.commit()
     
     # Log activité
     log = ActivityLog(
@@ -71,7 +98,6 @@ async def approve_user(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return {"message": "Utilisateur approuvé avec succès"}
 
@@ -88,7 +114,6 @@ async def reject_user(
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     
     user.registration_status = RegistrationStatus.REJECTED
-    db.commit()
     
     # Log activité
     log = ActivityLog(
@@ -97,7 +122,6 @@ async def reject_user(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return {"message": "Utilisateur refusé"}
 
@@ -117,7 +141,8 @@ async def block_user(
         raise HTTPException(status_code=400, detail="Impossible de bloquer un administrateur")
     
     user.is_active = False
-    db.commit()
+    # Les tokens déjà émis cessent d'être acceptés
+    revoke_user(db, user.id)
     
     # Log activité
     log = ActivityLog(
@@ -126,7 +151,6 @@ async def block_user(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return {"message": "Utilisateur bloqué"}
 
@@ -143,7 +167,6 @@ async def unblock_user(
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     
     user.is_active = True
-    db.commit()
     
     # Log activité
     log = ActivityLog(
@@ -152,7 +175,6 @@ async def unblock_user(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return {"message": "Utilisateur débloqué"}
 
@@ -179,8 +201,13 @@ async def delete_user(
     )
     db.add(log)
     
+    # Conserver l'historique sans référence vers le compte supprimé (clés étrangères actives)
+    db.query(ActivityLog).filter(ActivityLog.user_id == user.id).update(
+        {ActivityLog.user_id: None}, synchronize_session=False
+    )
+    unindex_user(db, user.id)
+    revoke_user(db, user.id)
     db.delete(user)
-    db.commit()
     
     return {"message": "Utilisateur supprimé"}
 
@@ -193,14 +220,8 @@ async def get_all_registrations(
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """Obtenir toutes les inscriptions"""
-    query = db.query(TournamentRegistration)
-    
-    if status_filter:
-        query = query.filter(TournamentRegistration.status == status_filter)
-    
-    registrations = query.order_by(desc(TournamentRegistration.created_at)).offset(skip).limit(limit).all()
-    return registrations
+    """Obtenir toutes les inscriptions (joueur inclus, une seule requête)"""
+    return json_response(list_registrations(db, skip, limit, status_filter))
 
 
 @router.get("/activity-logs")
@@ -215,6 +236,138 @@ async def get_activity_logs(
     return logs
 
 
+@router.post("/activity-logs/archive")
+async def archive_logs(
+    retention_days: Optional[int] = None,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Archiver et purger les logs d'activité anciens"""
+    if retention_days is not None and retention_days < 1:
+        raise HTTPException(status_code=400, detail="La rétention doit être d'au moins 1 jour")
+    
+    result = archive_activity_logs(db, retention_days=retention_days)
+    
+    # Log activité
+    log = ActivityLog(
+        action="ACTIVITY_LOGS_ARCHIVED",
+        details=f"{result['archived']} logs archivés par {current_user.email}",
+        user_id=current_user.id
+    )
+    db.add(log)
+    
+    return result
+
+
+@router.get("/activity-logs/archive")
+async def get_archived_logs(
+    start_date: date,
+    end_date: date,
+    current_user: User = Depends(get_current_admin)
+):
+    """Lire les logs archivés sur une période (flux NDJSON)"""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="Période invalide")
+    
+    lines = (json.dumps(entry, ensure_ascii=False) + "\n" for entry in iter_archived_logs(start_date, end_date))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.get("/export/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = "csv",
+    current_user: User = Depends(get_current_admin)
+):
+    """Exporter un jeu de données complet (users, registrations, matches, activity-logs)"""
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail="Jeu de données inconnu")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format non supporté (csv ou ndjson)")
+    
+    filename = f"{dataset}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream_export(dataset, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/jobs", response_model=List[JobResponse])
+async def get_jobs(
+    status_filter: Optional[JobStatus] = None,
+    limit: int = 50,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Derniers jobs en arrière-plan"""
+    query = db.query(Job)
+    
+    if status_filter:
+        query = query.filter(Job.status == status_filter)
+    
+    return query.order_by(desc(Job.id)).limit(min(limit, 200)).all()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """État et progression d'un job"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job non trouvé")
+    return job
+
+
+@router.post("/ratings/recompute", status_code=status.HTTP_202_ACCEPTED)
+async def recompute_player_ratings(
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Recalculer les cotes Elo depuis tout l'historique des matchs (job)"""
+    job = schedule_recompute(db, current_user.id)
+    return {"message": "Recalcul des cotes en cours", "job_id": job.id}
+
+
+@router.get("/metrics")
+async def get_metrics(
+    current_user: User = Depends(get_current_admin)
+):
+    """Métriques du worker : retard de la boucle d'événements (percentiles, blocages par route)"""
+    return {"event_loop": loop_lag_metrics()}
+
+
+@router.get("/metrics/event-loop/stalls")
+async def get_event_loop_stalls(
+    current_user: User = Depends(get_current_admin)
+):
+    """Derniers blocages de la boucle, avec la route et la pile relevées pendant le blocage"""
+    return recent_stalls()
+
+
+@router.get("/profiles")
+async def get_request_profiles(
+    current_user: User = Depends(get_current_admin)
+):
+    """Profils de requêtes gardés par ce worker, du plus lent au plus rapide"""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_admin)
+):
+    """Piles échantillonnées d'une requête (format collapsed : flamegraph.pl, speedscope)"""
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    return PlainTextResponse(collapsed_stacks(profile))
+
+
 @router.post("/tournaments", response_model=TournamentResponse)
 async def create_tournament(
     tournament: TournamentCreate,
@@ -224,8 +377,7 @@ async def create_tournament(
     """Créer un nouveau tournoi"""
     db_tournament = Tournament(**tournament.dict())
     db.add(db_tournament)
-    db.commit()
-    db.refresh(db_tournament)
+    db.flush()  # Identifiant pour la réponse
     
     # Log activité
     log = ActivityLog(
@@ -234,7 +386,6 @@ async def create_tournament(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return db_tournament
 
@@ -255,7 +406,8 @@ async def promote_to_admin(
     
     user.role = UserRole.ADMIN
     user.is_verified = True
-    db.commit()
+    # Forcer un refresh pour que le nouveau rôle figure dans les claims
+    revoke_user(db, user.id, keep_refresh_tokens=True)
     
     # Log activité
     log = ActivityLog(
@@ -264,7 +416,6 @@ async def promote_to_admin(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return {"message": "Utilisateur promu administrateur avec succès"}
 
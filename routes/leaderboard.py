@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from replica import get_read_db
+from models import Tournament
+from schemas import PlayerStatsResponse
+from player_stats import get_leaderboard
+
+router = APIRouter(prefix="/api/leaderboard", tags=["leaderboard"])
+
+
+def _to_response(stats, skip: int) -> List[PlayerStatsResponse]:
+    return [
+        PlayerStatsResponse(
+            rank=skip + index + 1,
+            user_id=row.user_id,
+            username=row.user.username,
+            full_name=row.user.full_name,
+            profile_picture=row.user.profile_picture,
+            played=row.played,
+            wins=row.wins,
+            draws=row.draws,
+            losses=row.losses,
+            goals_for=row.goals_for,
+            goals_against=row.goals_against,
+            goal_difference=row.goal_difference,
+            titles=row.titles
+        )
+        for index, row in enumerate(stats)
+    ]
+
+
+@router.get("/", response_model=List[PlayerStatsResponse])
+async def get_global_leaderboard(
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_read_db)
+):
+    """Classement général des joueurs"""
+    limit = min(limit, 100)
+    return _to_response(get_leaderboard(db, skip=skip, limit=limit), skip)
+
+
+@router.get("/tournaments/{tournament_id}", response_model=List[PlayerStatsResponse])
+async def get_tournament_leaderboard(
+    tournament_id: int,
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_read_db)
+):
+    """Classement des joueurs d'un tournoi"""
+    if not db.query(Tournament.id).filter(Tournament.id == tournament_id).first():
+        raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+    limit = min(limit, 100)
+    return _to_response(get_leaderboard(db, tournament_id=tournament_id, skip=skip, limit=limit), skip)
@@ -1,15 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
 
 from database import get_db
-from models import Match, Tournament, User, MatchStatus
-from schemas import MatchResponse, MatchBase
+from replica import get_read_db
+from models import Match, Tournament, TournamentSchedule, User, MatchStatus
+from schemas import MatchResponse, MatchBase, MatchDelay, PlayerMatch
 from auth import get_current_admin
+from player_stats import match_contribution, apply_contribution
+from scheduler import replan_after_delay, to_naive_utc
+from changes import mark_matches_changed
+from ratings import match_result, apply_match_rating, schedule_recompute
+from player_matches import player_match_history, next_player_match
 
 router = APIRouter(prefix="/api/matches", tags=["matches"])
 
 
+def ensure_tournament_not_finished(db: Session, tournament_id: int):
+    """Un tournoi terminé est figé (snapshot servi avec un cache d'un an) : plus d'écriture sur ses matchs"""
+    end_date = db.query(Tournament.end_date).filter(Tournament.id == tournament_id).scalar()
+    if end_date is not None:
+        raise HTTPException(status_code=400, detail="Tournoi terminé : ses matchs ne sont plus modifiables")
+
+
 @router.put("/{match_id}/score", response_model=MatchResponse)
 async def update_match_score(
     match_id: int,
@@ -22,6 +36,12 @@ async def update_match_score(
     if not match:
         raise HTTPException(status_code=404, detail="Match non trouvé")
     
+    ensure_tournament_not_finished(db, match.tournament_id)
+    
+    # Contribution actuelle aux statistiques (retirée en cas de correction)
+    previous_contribution = match_contribution(match)
+    previous_result = match_result(match)
+    
     # Mettre à jour les scores
     if match_data.player1_score is not None:
         match.player1_score = match_data.player1_score
@@ -32,26 +52,73 @@ async def update_match_score(
     if match.player1_score is not None and match.player2_score is not None:
         if match.player1_score > match.player2_score:
             match.winner_id = match.player1_id
-        elif match.player2_score < match.player1_score:
+        elif match.player2_score > match.player1_score:
             match.winner_id = match.player2_id
-        # En cas d'égalité, pas de gagnant pour l'instant
+        else:
+            # En cas d'égalité, pas de gagnant pour l'instant
+            match.winner_id = None
         
         match.status = MatchStatus.PLAYED
         match.is_manually_set = True
+        if match.played_at is None:
+            match.played_at = datetime.utcnow()
     
     if match_data.notes:
         match.notes = match_data.notes
     
-    db.commit()
-    db.refresh(match)
+    # Statistiques des joueurs
+    apply_contribution(db, match.tournament_id, previous_contribution, sign=-1)
+    apply_contribution(db, match.tournament_id, match_contribution(match))
+    
+    # Cotes Elo : mise à jour incrémentale au premier score, recalcul complet après une correction
+    if previous_result is None:
+        apply_match_rating(db, match)
+    elif match_result(match) != previous_result:
+        schedule_recompute(db, current_user.id)
+    
+    mark_matches_changed(db, match.tournament_id, Match.id == match.id)
     
     return match
 
 
+@router.post("/{match_id}/delay")
+async def report_match_delay(
+    match_id: int,
+    delay: MatchDelay,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Signaler un match en retard et replanifier les matchs suivants (admin uniquement)"""
+    match = db.query(Match).filter(Match.id == match_id).first()
+    if not match:
+        raise HTTPException(status_code=404, detail="Match non trouvé")
+    
+    ensure_tournament_not_finished(db, match.tournament_id)
+    
+    if match.scheduled_at is None:
+        raise HTTPException(status_code=400, detail="Match non planifié")
+    
+    schedule = db.query(TournamentSchedule).filter(TournamentSchedule.tournament_id == match.tournament_id).first()
+    if not schedule:
+        raise HTTPException(status_code=400, detail="Aucune planification pour ce tournoi")
+    
+    expected_end = to_naive_utc(delay.expected_end)
+    if expected_end <= match.scheduled_at:
+        raise HTTPException(status_code=400, detail="Fin prévue antérieure au début du match")
+    
+    try:
+        result = replan_after_delay(db, match, schedule, expected_end)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"message": "Planning mis à jour", **result}
+
+
 @router.get("/{match_id}", response_model=MatchResponse)
 async def get_match(
     match_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtenir un match spécifique"""
     match = db.query(Match).filter(Match.id == match_id).first()
@@ -59,3 +126,24 @@ async def get_match(
         raise HTTPException(status_code=404, detail="Match non trouvé")
     return match
 
+
+
+@router.get("/players/{user_id}", response_model=List[PlayerMatch])
+async def get_player_matches(
+    user_id: int,
+    skip: int = 0,
+    limit: int = 20,
+    match_status: MatchStatus = Query(MatchStatus.PLAYED, alias="status"),
+    db: Session = Depends(get_read_db)
+):
+    """Historique des matchs d'un joueur, tous tournois confondus (plus récents en tête)"""
+    return player_match_history(db, user_id, skip=max(skip, 0), limit=min(max(limit, 1), 100), match_status=match_status)
+
+
+@router.get("/players/{user_id}/next", response_model=Optional[PlayerMatch])
+async def get_player_next_match(
+    user_id: int,
+    db: Session = Depends(get_read_db)
+):
+    """Prochain match en attente d'un joueur (null s'il n'en a aucun)"""
+    return next_player_match(db, user_id)
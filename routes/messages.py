@@ -4,22 +4,46 @@ from sqlalchemy import desc
 from typing import List
 
 from database import get_db
+from replica import get_read_db
 from models import AdminMessage, ActivityLog
-from schemas import AdminMessageCreate, AdminMessageResponse
+from schemas import AdminMessageCreate, AdminMessageResponse, MessageChanges
 from auth import get_current_active_user, get_current_admin
+from changes import mark_message_changed, current_messages_version
+from listings import list_active_messages, json_response
 
 router = APIRouter(prefix="/api/messages", tags=["messages"])
 
 
 @router.get("/", response_model=List[AdminMessageResponse])
 async def get_messages(
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtenir tous les messages actifs"""
-    messages = db.query(AdminMessage).filter(
-        AdminMessage.is_active == True
-    ).order_by(desc(AdminMessage.is_important), desc(AdminMessage.created_at)).all()
-    return messages
+    return json_response(list_active_messages(db))
+
+
+@router.get("/changes", response_model=MessageChanges)
+async def get_message_changes(
+    since: int = 0,
+    db: Session = Depends(get_read_db)
+):
+    """Messages modifiés après le curseur since (0 : liste complète)"""
+    if since <= 0:
+        cursor = current_messages_version(db)
+        messages = db.query(AdminMessage).filter(
+            AdminMessage.is_active == True
+        ).order_by(desc(AdminMessage.is_important), desc(AdminMessage.created_at)).all()
+        return {"cursor": cursor, "messages": messages, "deleted": []}
+    
+    # Parcours d'intervalle sur l'index change_version, vide la plupart du temps
+    rows = db.query(AdminMessage).filter(
+        AdminMessage.change_version > since
+    ).order_by(AdminMessage.change_version).all()
+    return {
+        "cursor": max((row.change_version for row in rows), default=since),
+        "messages": [row for row in rows if row.is_active],
+        "deleted": [row.id for row in rows if not row.is_active]
+    }
 
 
 @router.post("/", response_model=AdminMessageResponse)
@@ -34,8 +58,8 @@ async def create_message(
         created_by=current_user.id
     )
     db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    mark_message_changed(db, db_message)
+    db.flush()  # Identifiant et created_at pour la réponse
     
     # Log activité
     log = ActivityLog(
@@ -44,7 +68,6 @@ async def create_message(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return db_message
 
@@ -64,8 +87,7 @@ async def update_message(
     db_message.title = message.title
     db_message.content = message.content
     db_message.is_important = message.is_important
-    db.commit()
-    db.refresh(db_message)
+    mark_message_changed(db, db_message)
     
     # Log activité
     log = ActivityLog(
@@ -74,7 +96,6 @@ async def update_message(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return db_message
 
@@ -99,7 +120,7 @@ async def delete_message(
     db.add(log)
     
     db_message.is_active = False
-    db.commit()
+    mark_message_changed(db, db_message)
     
     return {"message": "Message supprimé"}
 
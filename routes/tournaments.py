@@ -1,23 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import and_, desc, func, insert, select, union
+from typing import List, Optional
 import math
 
 from database import get_db
+from replica import get_read_db
 from models import (
-    Tournament, TournamentRegistration, Match, Bracket, User,
-    RegistrationStatus, MatchStatus, RoundType
+    Tournament, TournamentRegistration, Match, MatchTombstone, Bracket, User, PlayerStats, TournamentSchedule,
+    RegistrationStatus, MatchStatus, RoundType, TournamentFormat, SeedingMode
+)
+from schemas import (
+    TournamentResponse, MatchResponse, BracketResponse, StandingResponse, ScheduleRequest, TournamentView,
+    MatchChanges, BracketTreeResponse, PlayerBracketPath
 )
-from schemas import TournamentResponse, MatchResponse, BracketResponse
 from auth import get_current_active_user, get_current_admin
+from pairing import split_into_groups, round_robin_rounds, swiss_pairings
+from player_stats import STAT_FIELDS, match_contribution, apply_contribution
+from scheduler import schedule_tournament, to_naive_utc
+from changes import mark_matches_changed, delete_tournament_matches
+from jobs import job_handler, enqueue, PermanentJobError
+from bracket_tree import BracketTree, get_bracket_tree
+from ratings import get_ratings, seeded_slots
+from listings import list_tournament_matches, list_tournament_brackets, json_response
+from snapshots import snapshot_response, write_snapshot
+from config import settings
 from datetime import datetime
+import json
+
+# Taille des lots d'insertion pour les calendriers volumineux
+MATCH_INSERT_BATCH_SIZE = 5000
+
+# Colonnes de MatchSummary (vue du tournoi, synchronisation incrémentale)
+MATCH_SUMMARY_COLUMNS = (
+    Match.id, Match.round_type, Match.round_number, Match.match_number, Match.group_number,
+    Match.player1_id, Match.player2_id, Match.player1_score, Match.player2_score,
+    Match.winner_id, Match.status, Match.scheduled_at
+)
 
 router = APIRouter(prefix="/api/tournaments", tags=["tournaments"])
 
 
 @router.get("/", response_model=List[TournamentResponse])
 async def get_tournaments(
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtenir tous les tournois actifs"""
     tournaments = db.query(Tournament).filter(Tournament.is_active == True).all()
@@ -27,7 +53,7 @@ async def get_tournaments(
 @router.get("/{tournament_id}", response_model=TournamentResponse)
 async def get_tournament(
     tournament_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtenir un tournoi spécifique"""
     tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
@@ -81,13 +107,12 @@ async def register_to_tournament(
     # Mettre à jour le nombre de participants
     tournament.current_participants += 1
     
-    db.commit()
-    db.refresh(registration)
+    db.flush()  # Identifiant de l'inscription
     
     return {"message": "Inscription réussie", "registration": registration.id}
 
 
-def generate_brackets(tournament_id: int, db: Session):
+def generate_brackets(tournament_id: int, db: Session, seeding: SeedingMode = SeedingMode.REGISTRATION):
     """Générer automatiquement les brackets pour un tournoi"""
     # Obtenir tous les participants approuvés
     registrations = db.query(TournamentRegistration).filter(
@@ -105,9 +130,17 @@ def generate_brackets(tournament_id: int, db: Session):
     num_participants = len(participants)
     next_power_of_2 = 2 ** math.ceil(math.log2(num_participants))
     
+    # Places du premier tour, deux par match (None = exempt)
+    if seeding == SeedingMode.RATING:
+        ratings = get_ratings(db, [participant.id for participant in participants])
+        ranked = sorted(ratings, key=lambda user_id: -ratings[user_id])  # Tri stable : inscription à égalité
+        slots = seeded_slots(ranked, next_power_of_2)
+    else:
+        slots = [participant.id for participant in participants]
+    
     # Supprimer les anciens brackets et matchs
     db.query(Bracket).filter(Bracket.tournament_id == tournament_id).delete()
-    db.query(Match).filter(Match.tournament_id == tournament_id).delete()
+    delete_tournament_matches(db, tournament_id)
     
     # Créer les matchs du premier round
     round_number = 1
@@ -126,28 +159,37 @@ def generate_brackets(tournament_id: int, db: Session):
     match_number = 1
     
     # Créer les matchs pour les participants pairs
-    for i in range(0, len(participants) - 1, 2):
+    for i in range(0, len(slots) - 1, 2):
+        player1_id, player2_id = slots[i], slots[i + 1]
+        if player1_id is None:
+            player1_id, player2_id = player2_id, None
         match = Match(
             tournament_id=tournament_id,
             round_type=round_type,
             round_number=round_number,
             match_number=match_number,
-            player1_id=participants[i].id,
-            player2_id=participants[i + 1].id if i + 1 < len(participants) else None,
+            player1_id=player1_id,
+            player2_id=player2_id,
             status=MatchStatus.PENDING
         )
+        if player2_id is None:
+            # Tête de série exemptée du premier tour
+            match.winner_id = player1_id
+            match.status = MatchStatus.PLAYED
+            match.played_at = datetime.utcnow()
+            match.notes = "Exempt"
         db.add(match)
         matches.append(match)
         match_number += 1
     
     # Si nombre impair, le dernier participant passe directement au round suivant
-    if len(participants) % 2 == 1:
+    if len(slots) % 2 == 1:
         # Créer un match avec un joueur automatique
         pass
     
-    db.commit()
+    mark_matches_changed(db, tournament_id)
     
-    # Générer les brackets pour l'affichage
+    # Générer les brackets pour l'affichage (mark_matches_changed a attribué les identifiants)
     for i, match in enumerate(matches):
         if match.player1_id:
             bracket1 = Bracket(
@@ -171,18 +213,189 @@ def generate_brackets(tournament_id: int, db: Session):
             )
             db.add(bracket2)
     
-    db.commit()
-    
     return {"message": "Brackets générés avec succès"}
 
 
-@router.post("/{tournament_id}/start")
+def _approved_player_ids(tournament_id: int, db: Session) -> List[int]:
+    """Participants approuvés, par ordre d'inscription"""
+    rows = db.query(TournamentRegistration.user_id).filter(
+        TournamentRegistration.tournament_id == tournament_id,
+        TournamentRegistration.status == RegistrationStatus.APPROVED
+    ).order_by(TournamentRegistration.created_at, TournamentRegistration.id).all()
+    return [row.user_id for row in rows]
+
+
+def generate_round_robin(tournament: Tournament, db: Session):
+    """Générer tout le calendrier round-robin (poules si group_size est défini)"""
+    player_ids = _approved_player_ids(tournament.id, db)
+    if len(player_ids) < 2:
+        raise HTTPException(status_code=400, detail="Pas assez de participants")
+    
+    db.query(Bracket).filter(Bracket.tournament_id == tournament.id).delete()
+    delete_tournament_matches(db, tournament.id)
+    
+    groups = split_into_groups(player_ids, tournament.group_size or len(player_ids))
+    match_numbers = {}
+    batch = []
+    for group_number, group in enumerate(groups, start=1):
+        for round_number, pairs in enumerate(round_robin_rounds(group), start=1):
+            for player1_id, player2_id in pairs:
+                match_numbers[round_number] = match_numbers.get(round_number, 0) + 1
+                batch.append({
+                    "tournament_id": tournament.id,
+                    "round_type": RoundType.ROUND_ROBIN,
+                    "round_number": round_number,
+                    "match_number": match_numbers[round_number],
+                    "group_number": group_number if len(groups) > 1 else None,
+                    "player1_id": player1_id,
+                    "player2_id": player2_id,
+                    "status": MatchStatus.PENDING,
+                    "is_manually_set": False
+                })
+                if len(batch) >= MATCH_INSERT_BATCH_SIZE:
+                    db.execute(insert(Match), batch)
+                    batch = []
+    if batch:
+        db.execute(insert(Match), batch)
+    
+    mark_matches_changed(db, tournament.id)
+    
+    return {"message": "Calendrier round-robin généré avec succès"}
+
+
+def generate_swiss_round(tournament: Tournament, db: Session):
+    """Apparier la ronde suivante d'un tournoi au système suisse"""
+    player_ids = _approved_player_ids(tournament.id, db)
+    if len(player_ids) < 2:
+        raise HTTPException(status_code=400, detail="Pas assez de participants")
+    
+    history = db.query(Match.round_number, Match.player1_id, Match.player2_id, Match.status).filter(
+        Match.tournament_id == tournament.id
+    ).all()
+    
+    if any(row.status == MatchStatus.PENDING for row in history):
+        raise HTTPException(status_code=400, detail="La ronde en cours n'est pas terminée")
+    
+    round_number = max((row.round_number for row in history), default=0) + 1
+    if tournament.swiss_rounds and round_number > tournament.swiss_rounds:
+        raise HTTPException(status_code=400, detail="Toutes les rondes ont été jouées")
+    
+    played = set()
+    color_balance = {}
+    had_bye = set()
+    for row in history:
+        if row.player2_id is None:
+            had_bye.add(row.player1_id)
+            continue
+        played.add(frozenset((row.player1_id, row.player2_id)))
+        color_balance[row.player1_id] = color_balance.get(row.player1_id, 0) + 1
+        color_balance[row.player2_id] = color_balance.get(row.player2_id, 0) - 1
+    
+    # Classement courant, lu dans les statistiques maintenues au fil des scores
+    stats = {
+        row.user_id: row
+        for row in db.query(PlayerStats).filter(PlayerStats.tournament_id == tournament.id).all()
+    }
+    seeds = {player_id: index for index, player_id in enumerate(player_ids)}
+    points = {
+        player_id: 3 * stats[player_id].wins + stats[player_id].draws if player_id in stats else 0
+        for player_id in player_ids
+    }
+    
+    def ranking_key(player_id):
+        row = stats.get(player_id)
+        return (
+            -points[player_id],
+            -(row.goal_difference if row else 0),
+            -(row.goals_for if row else 0),
+            seeds[player_id]
+        )
+    
+    ranking = sorted(player_ids, key=ranking_key)
+    pairs, bye = swiss_pairings(ranking, points, played, color_balance, had_bye)
+    
+    db.execute(insert(Match), [
+        {
+            "tournament_id": tournament.id,
+            "round_type": RoundType.SWISS,
+            "round_number": round_number,
+            "match_number": match_number,
+            "player1_id": player1_id,
+            "player2_id": player2_id,
+            "status": MatchStatus.PENDING,
+            "is_manually_set": False
+        }
+        for match_number, (player1_id, player2_id) in enumerate(pairs, start=1)
+    ])
+    
+    if bye is not None:
+        bye_match = Match(
+            tournament_id=tournament.id,
+            round_type=RoundType.SWISS,
+            round_number=round_number,
+            match_number=len(pairs) + 1,
+            player1_id=bye,
+            winner_id=bye,
+            status=MatchStatus.PLAYED,
+            played_at=datetime.utcnow(),
+            notes="Exempt"
+        )
+        db.add(bye_match)
+        apply_contribution(db, tournament.id, match_contribution(bye_match))
+    
+    mark_matches_changed(db, tournament.id, Match.round_number == round_number)
+    
+    return {"message": f"Ronde {round_number} générée avec succès", "round_number": round_number}
+
+
+@job_handler("start_tournament")
+def run_start_tournament(db: Session, payload: dict, progress) -> dict:
+    """Job : générer les brackets ou le calendrier puis marquer le tournoi commencé
+
+    Rejouable (reprise après expiration du bail) : un tournoi déjà commencé est
+    le travail d'une tentative validée, et les matchs d'un tournoi non commencé
+    sont les restes d'une tentative interrompue, supprimés avant de générer.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == payload["tournament_id"]).first()
+    if not tournament:
+        raise PermanentJobError("Tournoi non trouvé")
+    
+    if tournament.is_started:
+        return {"message": "Tournoi déjà démarré", "tournament_id": tournament.id}
+    
+    # Dernier point de progression : progress() écrit dans une autre session, et SQLite
+    # n'accepte qu'un écrivain à la fois (la suite écrit jusqu'au commit unique de run_job)
+    progress(0.1, "Génération des matchs")
+    
+    # Seul ce job crée les matchs d'un tournoi non commencé
+    db.query(Bracket).filter(Bracket.tournament_id == tournament.id).delete()
+    delete_tournament_matches(db, tournament.id)
+    
+    try:
+        # Générer les brackets ou le calendrier selon le format
+        if tournament.format == TournamentFormat.ROUND_ROBIN:
+            generate_round_robin(tournament, db)
+        elif tournament.format == TournamentFormat.SWISS:
+            generate_swiss_round(tournament, db)
+        else:
+            generate_brackets(tournament.id, db, tournament.seeding)
+    except HTTPException as e:
+        raise PermanentJobError(e.detail)
+    
+    # Marquer le tournoi comme commencé (validé avec les matchs, dans la même transaction)
+    tournament.is_started = True
+    tournament.start_date = datetime.utcnow()
+    
+    return {"message": "Tournoi démarré avec succès", "tournament_id": tournament.id}
+
+
+@router.post("/{tournament_id}/start", status_code=status.HTTP_202_ACCEPTED)
 async def start_tournament(
     tournament_id: int,
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """Démarrer un tournoi et générer les brackets"""
+    """Démarrer un tournoi : la génération des brackets s'exécute en tâche de fond"""
     tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournoi non trouvé")
@@ -190,37 +403,390 @@ async def start_tournament(
     if tournament.is_started:
         raise HTTPException(status_code=400, detail="Tournoi déjà commencé")
     
-    # Générer les brackets
-    generate_brackets(tournament_id, db)
+    job = enqueue(
+        db, "start_tournament", {"tournament_id": tournament_id},
+        created_by=current_user.id,
+        dedupe_key=f"start_tournament:{tournament_id}"
+    )
     
-    # Marquer le tournoi comme commencé
-    tournament.is_started = True
-    tournament.start_date = datetime.utcnow()
-    db.commit()
+    return {"message": "Démarrage du tournoi en cours", "job_id": job.id}
+
+
+@job_handler("snapshot_tournament")
+def run_snapshot_tournament(db: Session, payload: dict, progress) -> dict:
+    """Job : figer la vue d'un tournoi terminé, puis supprimer ses brackets si demandé
+
+    Rejouable : le snapshot est réécrit à l'identique.
+    """
+    tournament_id = payload["tournament_id"]
+    view = build_tournament_view(db, tournament_id)
+    if view is None:
+        raise PermanentJobError("Tournoi non trouvé")
+    if view["tournament"].end_date is None:
+        raise PermanentJobError("Tournoi non terminé")
+    
+    progress(0.1, "Rendu du snapshot")
+    body = TournamentView.model_validate(view, from_attributes=True).model_dump_json().encode("utf-8")
+    result = write_snapshot(tournament_id, body)
     
-    return {"message": "Tournoi démarré avec succès"}
+    # Les rondes du bracket sont dans le snapshot : les lignes détaillées ne servent plus,
+    # à condition que le snapshot survive aux redéploiements
+    pruned = 0
+    if payload.get("prune_brackets") and settings.TOURNAMENT_SNAPSHOT_DURABLE:
+        pruned = db.query(Bracket).filter(Bracket.tournament_id == tournament_id).delete(synchronize_session=False)
+    
+    return {"tournament_id": tournament_id, "pruned_brackets": pruned, **result}
+
+
+@router.post("/{tournament_id}/finish", status_code=status.HTTP_202_ACCEPTED)
+async def finish_tournament(
+    tournament_id: int,
+    prune_brackets: bool = settings.TOURNAMENT_SNAPSHOT_PRUNE_BRACKETS,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Terminer un tournoi : sa vue est figée dans un snapshot en tâche de fond"""
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+    
+    if not tournament.is_started:
+        raise HTTPException(status_code=400, detail="Tournoi non commencé")
+    
+    # Le snapshot est servi avec un cache d'un an : il n'est jamais réécrit
+    if tournament.end_date is not None:
+        raise HTTPException(status_code=400, detail="Tournoi déjà terminé")
+    
+    # Sans disque persistant, un redéploiement efface le snapshot : les rondes seraient perdues
+    if prune_brackets and not settings.TOURNAMENT_SNAPSHOT_DURABLE:
+        raise HTTPException(
+            status_code=400,
+            detail="Suppression des brackets refusée : snapshots hors disque persistant (TOURNAMENT_SNAPSHOT_DURABLE)"
+        )
+    
+    # Scores figés dès maintenant (voir ensure_tournament_not_finished), avant le rendu du snapshot
+    tournament.end_date = datetime.utcnow()
+    
+    job = enqueue(
+        db, "snapshot_tournament", {"tournament_id": tournament_id, "prune_brackets": prune_brackets},
+        created_by=current_user.id,
+        dedupe_key=f"snapshot_tournament:{tournament_id}"
+    )
+    
+    return {"message": "Tournoi terminé, snapshot en cours", "job_id": job.id}
+
+
+@router.post("/{tournament_id}/swiss/next-round")
+async def next_swiss_round(
+    tournament_id: int,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Apparier la ronde suivante (système suisse)"""
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+    
+    if tournament.format != TournamentFormat.SWISS:
+        raise HTTPException(status_code=400, detail="Ce tournoi n'est pas au système suisse")
+    
+    if not tournament.is_started:
+        raise HTTPException(status_code=400, detail="Tournoi non commencé")
+    
+    if tournament.end_date is not None:
+        raise HTTPException(status_code=400, detail="Tournoi terminé : ses matchs ne sont plus modifiables")
+    
+    return generate_swiss_round(tournament, db)
+
+
+@router.post("/{tournament_id}/schedule")
+async def schedule_matches(
+    tournament_id: int,
+    schedule_data: ScheduleRequest,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Planifier automatiquement les matchs en attente sur des fenêtres horaires"""
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+    
+    if tournament.end_date is not None:
+        raise HTTPException(status_code=400, detail="Tournoi terminé : ses matchs ne sont plus modifiables")
+    
+    windows = [(to_naive_utc(window.start), to_naive_utc(window.end)) for window in schedule_data.windows]
+    if not windows or any(end <= start for start, end in windows):
+        raise HTTPException(status_code=400, detail="Fenêtres horaires invalides")
+    
+    # Conserver les paramètres pour les replanifications
+    schedule = db.query(TournamentSchedule).filter(TournamentSchedule.tournament_id == tournament_id).first()
+    if not schedule:
+        schedule = TournamentSchedule(tournament_id=tournament_id)
+        db.add(schedule)
+    schedule.windows = json.dumps([[start.isoformat(), end.isoformat()] for start, end in windows])
+    schedule.match_duration_minutes = schedule_data.match_duration_minutes
+    schedule.min_rest_minutes = schedule_data.min_rest_minutes
+    schedule.max_concurrent_matches = schedule_data.max_concurrent_matches
+    
+    try:
+        result = schedule_tournament(db, tournament, schedule)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"message": "Matchs planifiés avec succès", **result}
+
+
+@router.get("/{tournament_id}/standings", response_model=List[StandingResponse])
+async def get_tournament_standings(
+    tournament_id: int,
+    group: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Classement d'un tournoi (3 points la victoire, 1 le nul), éventuellement d'une poule"""
+    return build_standings(db, tournament_id, group)
+
+
+def build_standings(db: Session, tournament_id: int, group: Optional[int] = None) -> List[StandingResponse]:
+    """Classement de tous les participants, à zéro tant qu'ils n'ont pas de statistiques
+
+    Participants : inscrits approuvés (et joueurs ayant déjà des statistiques),
+    ou, pour une poule, les joueurs de ses matchs, même tous en attente.
+    """
+    if group is None:
+        participants = union(
+            select(TournamentRegistration.user_id.label("user_id")).where(
+                TournamentRegistration.tournament_id == tournament_id,
+                TournamentRegistration.status == RegistrationStatus.APPROVED
+            ),
+            select(PlayerStats.user_id).where(PlayerStats.tournament_id == tournament_id)
+        )
+    else:
+        in_group = (Match.tournament_id == tournament_id, Match.group_number == group)
+        participants = union(
+            select(Match.player1_id.label("user_id")).where(*in_group, Match.player1_id.isnot(None)),
+            select(Match.player2_id).where(*in_group, Match.player2_id.isnot(None))
+        )
+    participants = participants.subquery()
+    
+    stats = {field: func.coalesce(getattr(PlayerStats, field), 0).label(field) for field in STAT_FIELDS}
+    points = (3 * stats["wins"].element + stats["draws"].element).label("points")
+    rows = db.execute(
+        select(User.id, User.username, User.full_name, User.profile_picture, *stats.values(), points)
+        .select_from(participants)
+        .join(User, User.id == participants.c.user_id)
+        .outerjoin(PlayerStats, and_(
+            PlayerStats.user_id == participants.c.user_id,
+            PlayerStats.tournament_id == tournament_id
+        ))
+        .order_by(desc(points), desc(stats["goal_difference"]), desc(stats["goals_for"]), User.id)
+    ).all()
+    
+    return [
+        StandingResponse(
+            rank=index + 1,
+            user_id=row.id,
+            username=row.username,
+            full_name=row.full_name,
+            profile_picture=row.profile_picture,
+            points=row.points,
+            **{field: getattr(row, field) for field in STAT_FIELDS}
+        )
+        for index, row in enumerate(rows)
+    ]
 
 
 @router.get("/{tournament_id}/brackets", response_model=List[BracketResponse])
 async def get_tournament_brackets(
     tournament_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtenir les brackets d'un tournoi"""
-    brackets = db.query(Bracket).filter(
-        Bracket.tournament_id == tournament_id
-    ).order_by(Bracket.round_number, Bracket.position).all()
-    return brackets
+    return json_response(list_tournament_brackets(db, tournament_id))
+
+
+def _load_bracket_tree(tournament_id: int, db: Session):
+    """(version, arbre) d'un tournoi à élimination directe, ou 404"""
+    tournament_format = db.execute(select(Tournament.format).where(Tournament.id == tournament_id)).scalar()
+    if tournament_format is None:
+        raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+    if tournament_format != TournamentFormat.SINGLE_ELIMINATION:
+        raise HTTPException(status_code=400, detail="Ce format de tournoi n'a pas de bracket")
+    version, tree = get_bracket_tree(db, tournament_id)
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Brackets non générés")
+    return version, tree
+
+
+def _path_step(tree: BracketTree, node: int, child: int) -> dict:
+    """Match du nœud vu depuis le joueur qualifié par child"""
+    return {
+        "round_number": tree.round_of(node),
+        "match_number": tree.match_number(node),
+        "match_id": tree.match_ids[node] or None,
+        "opponent_id": tree.occupants[tree.sibling(child)] or None,
+        "winner_id": tree.occupants[node] or None
+    }
+
+
+@router.get("/{tournament_id}/bracket-tree", response_model=BracketTreeResponse)
+async def get_tournament_bracket_tree(
+    tournament_id: int,
+    encoding: str = "json",
+    db: Session = Depends(get_read_db)
+):
+    """Bracket compact en tas binaire (encoding=binary : octets, 4 par nœud)"""
+    version, tree = _load_bracket_tree(tournament_id, db)
+    if encoding == "binary":
+        return Response(
+            content=tree.to_bytes(),
+            media_type="application/octet-stream",
+            headers={"X-Change-Cursor": str(version)}
+        )
+    return {"cursor": version, **tree.to_dict()}
+
+
+@router.get("/{tournament_id}/bracket-tree/players/{user_id}", response_model=PlayerBracketPath)
+async def get_player_bracket_path(
+    tournament_id: int,
+    user_id: int,
+    db: Session = Depends(get_read_db)
+):
+    """Parcours d'un joueur jusqu'à la finale et prochain adversaire"""
+    _, tree = _load_bracket_tree(tournament_id, db)
+    leaf = tree.leaf_of(user_id)
+    if leaf is None:
+        raise HTTPException(status_code=404, detail="Joueur absent du bracket")
+    
+    path = []
+    child = leaf
+    for node in tree.path_to_final(user_id):
+        path.append(_path_step(tree, node, child))
+        child = node
+    
+    furthest = tree.furthest_node(user_id)
+    next_match = tree.next_match(user_id)
+    if furthest == 1:
+        player_status = "champion"
+    elif next_match is None:
+        player_status = "eliminated"
+    else:
+        player_status = "active"
+    
+    return {
+        "user_id": user_id,
+        "status": player_status,
+        "path": path,
+        "next_match": _path_step(tree, next_match[0], furthest) if next_match else None
+    }
 
 
 @router.get("/{tournament_id}/matches", response_model=List[MatchResponse])
 async def get_tournament_matches(
     tournament_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Obtenir tous les matchs d'un tournoi"""
-    matches = db.query(Match).filter(
-        Match.tournament_id == tournament_id
-    ).order_by(Match.round_number, Match.match_number).all()
-    return matches
+    """Obtenir tous les matchs d'un tournoi (joueurs inclus, une seule requête)"""
+    return json_response(list_tournament_matches(db, tournament_id))
+
 
+
+@router.get("/{tournament_id}/matches/changes", response_model=MatchChanges)
+async def get_tournament_match_changes(
+    tournament_id: int,
+    since: int = 0,
+    db: Session = Depends(get_read_db)
+):
+    """Matchs modifiés ou supprimés après le curseur since (0 : tous les matchs)"""
+    version = db.execute(select(Tournament.change_version).where(Tournament.id == tournament_id)).scalar()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+    
+    # Cas courant : rien n'a changé, une lecture par clé primaire suffit
+    if since >= version:
+        return {"cursor": since, "matches": [], "deleted": []}
+    
+    matches = db.execute(
+        select(*MATCH_SUMMARY_COLUMNS)
+        .where(Match.tournament_id == tournament_id, Match.change_version > since)
+        .order_by(Match.round_number, Match.match_number)
+    ).all()
+    deleted = db.execute(
+        select(MatchTombstone.match_id)
+        .where(MatchTombstone.tournament_id == tournament_id, MatchTombstone.change_version > since)
+    ).scalars().all() if since > 0 else []
+    
+    return {
+        "cursor": version,
+        "matches": [match._asdict() for match in matches],
+        "deleted": deleted
+    }
+
+
+@router.get("/{tournament_id}/view", response_model=TournamentView)
+async def get_tournament_view(
+    tournament_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db)
+):
+    """Tournoi, rondes, matchs et joueurs en une réponse (4 requêtes, joueurs dédupliqués)
+
+    Tournoi terminé et figé : fichier snapshot servi tel quel, sans requête SQL.
+    """
+    snapshot = snapshot_response(request, tournament_id)
+    if snapshot is not None:
+        return snapshot
+    
+    view = build_tournament_view(db, tournament_id)
+    if view is None:
+        raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+    return view
+
+
+def build_tournament_view(db: Session, tournament_id: int) -> Optional[dict]:
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if not tournament:
+        return None
+    
+    brackets = db.execute(
+        select(Bracket.round_number, Bracket.round_type, Bracket.position, Bracket.user_id, Bracket.match_id)
+        .where(Bracket.tournament_id == tournament_id)
+        .order_by(Bracket.round_number, Bracket.position)
+    ).all()
+    matches = db.execute(
+        select(*MATCH_SUMMARY_COLUMNS)
+        .where(Match.tournament_id == tournament_id)
+        .order_by(Match.round_number, Match.match_number)
+    ).all()
+    
+    rounds = {}
+    for slot in brackets:
+        round_entry = rounds.setdefault(
+            slot.round_number,
+            {"round_number": slot.round_number, "round_type": slot.round_type, "slots": []}
+        )
+        round_entry["slots"].append({"position": slot.position, "user_id": slot.user_id, "match_id": slot.match_id})
+    
+    player_ids = {slot.user_id for slot in brackets}
+    for match in matches:
+        player_ids.update((match.player1_id, match.player2_id, match.winner_id))
+    player_ids.discard(None)
+    
+    players = {}
+    if player_ids:
+        rows = db.execute(
+            select(User.id, User.username, User.full_name, User.profile_picture).where(User.id.in_(player_ids))
+        ).all()
+        players = {row.id: row._asdict() for row in rows}
+    
+    view = {
+        "tournament": tournament,
+        "rounds": list(rounds.values()),
+        "matches": [match._asdict() for match in matches],
+        "players": players,
+        "cursor": tournament.change_version
+    }
+    # Tournoi terminé : classement final, dans le snapshot comme dans la vue reconstruite sans lui
+    if tournament.end_date is not None:
+        view["standings"] = build_standings(db, tournament_id)
+    return view
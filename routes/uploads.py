@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import User, TournamentRegistration, UserRole
+from auth import get_token_user, TokenUser
+from uploads import UploadFileResponse, resolve_upload
+
+router = APIRouter(prefix="/api/uploads", tags=["uploads"])
+
+
+@router.api_route("/profiles/{filename}", methods=["GET", "HEAD"])
+async def get_profile_picture(filename: str):
+    """Photo de profil (publique : affichée dans les brackets et classements)"""
+    path = resolve_upload("profiles", filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Fichier non trouvé")
+    return UploadFileResponse(path, f"profiles/{filename}", public=True)
+
+
+@router.api_route("/payments/{filename}", methods=["GET", "HEAD"])
+async def get_payment_proof(
+    filename: str,
+    current_user: TokenUser = Depends(get_token_user),
+    db: Session = Depends(get_db)
+):
+    """Preuve de paiement (son propriétaire ou un admin uniquement)"""
+    relative_path = f"payments/{filename}"
+    if current_user.role != UserRole.ADMIN:
+        owns_file = db.query(User.id).filter(
+            User.id == current_user.id, User.payment_proof == relative_path
+        ).first() or db.query(TournamentRegistration.id).filter(
+            TournamentRegistration.user_id == current_user.id,
+            TournamentRegistration.payment_proof == relative_path
+        ).first()
+        if not owns_file:
+            # Même réponse qu'un fichier absent : ne pas révéler son existence
+            raise HTTPException(status_code=404, detail="Fichier non trouvé")
+    
+    path = resolve_upload("payments", filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Fichier non trouvé")
+    return UploadFileResponse(path, relative_path, public=False)
@@ -1,23 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Cookie
 from fastapi.responses import JSONResponse, FileResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from typing import Optional
+from datetime import datetime
 import os
 import shutil
 from pathlib import Path
 
 from database import get_db
 from models import User, RegistrationStatus, ActivityLog
-from schemas import UserCreate, UserLogin, UserResponse, UserUpdate, Token
+from schemas import UserCreate, UserLogin, UserResponse, UserUpdate, Token, RefreshRequest
 from auth import (
     get_current_active_user,
     authenticate_user,
     create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    user_claims,
+    security,
     get_password_hash,
     get_current_admin
 )
-from config import settings
+from revocation import is_revoked, revoke_token
+from config import settings, ensure_upload_dirs
+from uploads import content_hashed_filename
+from search import index_user
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -51,8 +61,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db.flush()  # Identifiant pour l'index et le log, created_at renvoyé par l'INSERT
+    
+    # Index de recherche
+    index_user(db, db_user)
     
     # Log activité
     log = ActivityLog(
@@ -61,11 +73,30 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         user_id=db_user.id
     )
     db.add(log)
-    db.commit()
     
     return db_user
 
 
+def _set_auth_cookies(response: JSONResponse, access_token: str, refresh_token: Optional[str], remember_me: bool):
+    """Cookies de session : access token court, refresh token persistant si remember_me"""
+    response.set_cookie(
+        key="session_token",
+        value=access_token,
+        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        httponly=True,
+        samesite="lax"
+    )
+    if refresh_token:
+        response.set_cookie(
+            key="refresh_token",
+            value=refresh_token,
+            max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60 if remember_me else None,
+            path="/api/users",
+            httponly=True,
+            samesite="lax"
+        )
+
+
 @router.post("/login", response_model=Token)
 async def login(
     user_data: UserLogin,
@@ -86,20 +117,11 @@ async def login(
         )
     
     # Mettre à jour last_login
-    from datetime import datetime
     user.last_login = datetime.utcnow()
-    db.commit()
     
-    # Créer le token
-    expires_delta = None
-    if user_data.remember_me:
-        from datetime import timedelta
-        expires_delta = timedelta(days=30)
-    
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
-        expires_delta=expires_delta
-    )
+    # Créer les tokens
+    access_token = create_access_token(data=user_claims(user))
+    refresh_token = create_refresh_token(user.id)
     
     # Log activité
     log = ActivityLog(
@@ -108,33 +130,84 @@ async def login(
         user_id=user.id
     )
     db.add(log)
-    db.commit()
     
     response = JSONResponse(
         content={
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
-            "user": UserResponse.from_orm(user).dict()
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            "user": jsonable_encoder(UserResponse.from_orm(user))
         }
     )
-    # Cookie pour session persistante
-    if user_data.remember_me:
-        response.set_cookie(
-            key="session_token",
-            value=access_token,
-            max_age=30 * 24 * 60 * 60,  # 30 jours
-            httponly=True,
-            samesite="lax"
+    # Cookies pour session persistante
+    _set_auth_cookies(response, access_token, refresh_token, user_data.remember_me)
+    
+    return response
+
+
+@router.post("/refresh")
+async def refresh(
+    refresh_data: Optional[RefreshRequest] = None,
+    refresh_token: Optional[str] = Cookie(None),
+    db: Session = Depends(get_db)
+):
+    """Obtenir un nouvel access token à partir d'un refresh token"""
+    token_value = refresh_data.refresh_token if refresh_data and refresh_data.refresh_token else refresh_token
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Session expirée"
+    )
+    if not token_value:
+        raise credentials_exception
+    
+    payload = decode_access_token(token_value)
+    if payload is None or payload.get("type") != "refresh" or is_revoked(payload):
+        raise credentials_exception
+    
+    # Seul point où la base est relue : le rôle et le statut à jour passent dans les claims
+    user = db.query(User).filter(User.id == int(payload["sub"])).first()
+    if not user:
+        raise credentials_exception
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Compte désactivé"
         )
     
+    access_token = create_access_token(data=user_claims(user))
+    response = JSONResponse(content={
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    })
+    _set_auth_cookies(response, access_token, None, False)
     return response
 
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    token: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    session_token: Optional[str] = Cookie(None),
+    refresh_token: Optional[str] = Cookie(None),
+    refresh_data: Optional[RefreshRequest] = None,
+    db: Session = Depends(get_db)
+):
     """Déconnexion"""
+    # Révoquer l'access token et le refresh token présentés
+    presented = [
+        token.credentials if token else session_token,
+        refresh_data.refresh_token if refresh_data and refresh_data.refresh_token else refresh_token
+    ]
+    for value in presented:
+        payload = decode_access_token(value) if value else None
+        if payload and payload.get("jti"):
+            revoke_token(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    
     response = JSONResponse(content={"message": "Déconnecté avec succès"})
     response.delete_cookie(key="session_token")
+    response.delete_cookie(key="refresh_token", path="/api/users")
     return response
 
 
@@ -165,8 +238,8 @@ async def update_current_user(
     if user_data.phone is not None:
         current_user.phone = user_data.phone
     
-    db.commit()
-    db.refresh(current_user)
+    # Index de recherche
+    index_user(db, current_user)
     
     # Log activité
     log = ActivityLog(
@@ -175,7 +248,6 @@ async def update_current_user(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return current_user
 
@@ -209,7 +281,7 @@ async def upload_profile_picture(
     
     # Générer un nom de fichier unique
     file_ext = Path(file.filename).suffix
-    filename = f"profile_{current_user.id}_{int(__import__('time').time())}{file_ext}"
+    filename = content_hashed_filename("profile", current_user.id, contents, file_ext)
     filepath = os.path.join(settings.UPLOAD_DIR, "profiles", filename)
     
     # Supprimer l'ancienne photo si elle existe
@@ -219,12 +291,12 @@ async def upload_profile_picture(
             os.remove(old_path)
     
     # Sauvegarder le fichier
+    ensure_upload_dirs()
     with open(filepath, "wb") as f:
         f.write(contents)
     
     # Mettre à jour l'utilisateur
     current_user.profile_picture = f"profiles/{filename}"
-    db.commit()
     
     # Log activité
     log = ActivityLog(
@@ -233,7 +305,6 @@ async def upload_profile_picture(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return {"message": "Photo de profil uploadée avec succès", "filename": current_user.profile_picture}
 
@@ -261,7 +332,7 @@ async def upload_payment_proof(
     
     # Générer un nom de fichier unique
     file_ext = Path(file.filename).suffix
-    filename = f"payment_{current_user.id}_{int(__import__('time').time())}{file_ext}"
+    filename = content_hashed_filename("payment", current_user.id, contents, file_ext)
     filepath = os.path.join(settings.UPLOAD_DIR, "payments", filename)
     
     # Supprimer l'ancienne preuve si elle existe
@@ -271,12 +342,12 @@ async def upload_payment_proof(
             os.remove(old_path)
     
     # Sauvegarder le fichier
+    ensure_upload_dirs()
     with open(filepath, "wb") as f:
         f.write(contents)
     
     # Mettre à jour l'utilisateur
     current_user.payment_proof = f"payments/{filename}"
-    db.commit()
     
     # Log activité
     log = ActivityLog(
@@ -285,7 +356,6 @@ async def upload_payment_proof(
         user_id=current_user.id
     )
     db.add(log)
-    db.commit()
     
     return {"message": "Preuve de paiement uploadée avec succès", "filename": current_user.payment_proof}
 
@@ -0,0 +1,224 @@
+"""
+Planification automatique des matchs (Match.scheduled_at)
+Les fenêtres horaires sont découpées en créneaux de la durée d'un match ;
+chaque créneau accepte au plus max_concurrent matchs. Les matchs sont placés
+dans l'ordre des rondes, au premier créneau libre qui respecte le repos
+minimum des deux joueurs et la fin de la ronde précédente
+"""
+import json
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from changes import next_tournament_version
+from models import Match, MatchStatus, Tournament, TournamentFormat, TournamentSchedule
+
+Window = Tuple[datetime, datetime]
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Les dates sont stockées en UTC naïf (comme datetime.utcnow())"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class SlotGrid:
+    """Créneaux triés avec leur capacité restante
+
+    Un union-find (parent) saute directement les créneaux pleins : trouver le
+    premier créneau libre après une date coûte O(log n) amorti.
+    """
+
+    def __init__(self, windows: Iterable[Window], duration: timedelta, max_concurrent: int):
+        self.duration = duration
+        self.starts: List[datetime] = []
+        for start, end in sorted(windows):
+            slot = start
+            while slot + duration <= end:
+                if not self.starts or slot > self.starts[-1]:
+                    self.starts.append(slot)
+                slot += duration
+        self.remaining = [max_concurrent] * len(self.starts)
+        self.parent = list(range(len(self.starts) + 1))
+
+    def _find(self, index: int) -> int:
+        root = index
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[index] != root:
+            self.parent[index], index = root, self.parent[index]
+        return root
+
+    def _consume(self, index: int):
+        self.remaining[index] -= 1
+        if self.remaining[index] <= 0:
+            self.parent[index] = index + 1
+
+    def take_first_free(self, earliest: datetime) -> Optional[datetime]:
+        """Réserver le premier créneau libre commençant à earliest ou après"""
+        index = self._find(bisect_left(self.starts, earliest))
+        if index == len(self.starts):
+            return None
+        self._consume(index)
+        return self.starts[index]
+
+    def occupy(self, start: datetime, end: datetime):
+        """Retirer une place à chaque créneau chevauchant [start, end) (match déjà placé)"""
+        index = max(bisect_left(self.starts, start - self.duration + timedelta(microseconds=1)), 0)
+        while index < len(self.starts) and self.starts[index] < end:
+            if self.remaining[index] > 0:
+                self._consume(index)
+            index += 1
+
+
+def plan_matches(
+    matches: Sequence,
+    grid: SlotGrid,
+    min_rest: timedelta,
+    round_barrier: bool = True,
+    fixed: Sequence = (),
+    fixed_ends: Optional[Dict[int, datetime]] = None,
+    keep_announced: bool = False
+) -> Dict[int, datetime]:
+    """Placer des matchs dans la grille
+
+    matches : lignes (id, round_number, player1_id, player2_id, scheduled_at) à planifier
+    fixed : matchs déjà placés qui ne bougent pas (occupent la grille et les joueurs)
+    fixed_ends : fin réelle ou prévue de certains matchs fixes (match en retard)
+    keep_announced : ne jamais avancer un match avant l'horaire déjà annoncé
+    Lève ValueError s'il n'y a plus de créneau disponible.
+    """
+    fixed_ends = fixed_ends or {}
+    player_ready: Dict[int, datetime] = {}
+    round_end: Dict[int, datetime] = {}
+
+    def reserve(round_number, player_ids, start, end):
+        for player_id in player_ids:
+            if player_id is not None:
+                player_ready[player_id] = max(player_ready.get(player_id, start), end + min_rest)
+        if round_number not in round_end or end > round_end[round_number]:
+            round_end[round_number] = end
+
+    for match in fixed:
+        end = fixed_ends.get(match.id, match.scheduled_at + grid.duration)
+        grid.occupy(match.scheduled_at, end)
+        reserve(match.round_number, (match.player1_id, match.player2_id), match.scheduled_at, end)
+
+    assignments = {}
+    current_round = None
+    barrier = None
+    for match in sorted(matches, key=lambda m: (m.round_number, m.id)):
+        if round_barrier and match.round_number != current_round:
+            # Les rondes précédentes sont entièrement placées : leur fin est définitive
+            current_round = match.round_number
+            previous_ends = [end for number, end in round_end.items() if number < current_round]
+            barrier = max(previous_ends) if previous_ends else None
+
+        earliest = grid.starts[0] if grid.starts else datetime.min
+        if barrier is not None:
+            earliest = max(earliest, barrier)
+        for player_id in (match.player1_id, match.player2_id):
+            if player_id in player_ready:
+                earliest = max(earliest, player_ready[player_id])
+        if keep_announced and match.scheduled_at is not None:
+            earliest = max(earliest, match.scheduled_at)
+
+        start = grid.take_first_free(earliest)
+        if start is None:
+            raise ValueError("Créneaux insuffisants pour planifier tous les matchs")
+        assignments[match.id] = start
+        reserve(match.round_number, (match.player1_id, match.player2_id), start, start + grid.duration)
+
+    return assignments
+
+
+def load_windows(schedule: TournamentSchedule) -> List[Window]:
+    return [(datetime.fromisoformat(start), datetime.fromisoformat(end)) for start, end in json.loads(schedule.windows)]
+
+
+def _grid(schedule: TournamentSchedule) -> SlotGrid:
+    return SlotGrid(
+        load_windows(schedule),
+        timedelta(minutes=schedule.match_duration_minutes),
+        schedule.max_concurrent_matches
+    )
+
+
+def _match_rows(db: Session, tournament_id: int):
+    return db.query(
+        Match.id, Match.round_number, Match.player1_id, Match.player2_id,
+        Match.scheduled_at, Match.status
+    ).filter(Match.tournament_id == tournament_id).all()
+
+
+def _write_assignments(
+    db: Session,
+    tournament_id: int,
+    assignments: Dict[int, datetime],
+    current: Dict[int, Optional[datetime]]
+) -> int:
+    """Écrire en une seule requête groupée les horaires qui ont changé (avec leur version)"""
+    changed = [(match_id, start) for match_id, start in assignments.items() if current.get(match_id) != start]
+    if changed:
+        version = next_tournament_version(db, tournament_id)
+        db.execute(update(Match), [
+            {"id": match_id, "scheduled_at": start, "change_version": version}
+            for match_id, start in changed
+        ])
+    return len(changed)
+
+
+def schedule_tournament(db: Session, tournament: Tournament, schedule: TournamentSchedule) -> dict:
+    """Planifier tous les matchs en attente d'un tournoi"""
+    rows = _match_rows(db, tournament.id)
+    pending = [row for row in rows if row.status == MatchStatus.PENDING]
+    assignments = plan_matches(
+        pending,
+        _grid(schedule),
+        timedelta(minutes=schedule.min_rest_minutes),
+        round_barrier=tournament.format != TournamentFormat.ROUND_ROBIN
+    )
+    updated = _write_assignments(db, tournament.id, assignments, {row.id: row.scheduled_at for row in rows})
+    return {
+        "scheduled": len(assignments),
+        "updated": updated,
+        "last_match_at": max(assignments.values()).isoformat() if assignments else None
+    }
+
+
+def replan_after_delay(db: Session, match: Match, schedule: TournamentSchedule, expected_end: datetime) -> dict:
+    """Replanifier uniquement les matchs situés après un match en retard
+
+    Les matchs antérieurs ne bougent pas ; les suivants ne sont jamais avancés
+    par rapport à l'horaire déjà annoncé.
+    """
+    rows = _match_rows(db, match.tournament_id)
+    late_start = match.scheduled_at
+    fixed = []
+    to_plan = []
+    for row in rows:
+        if row.id == match.id:
+            fixed.append(row)
+        elif row.status != MatchStatus.PENDING:
+            continue
+        elif row.scheduled_at is not None and row.scheduled_at < late_start:
+            fixed.append(row)
+        else:
+            to_plan.append(row)
+
+    tournament = db.query(Tournament).filter(Tournament.id == match.tournament_id).first()
+    assignments = plan_matches(
+        to_plan,
+        _grid(schedule),
+        timedelta(minutes=schedule.min_rest_minutes),
+        round_barrier=tournament.format != TournamentFormat.ROUND_ROBIN,
+        fixed=fixed,
+        fixed_ends={match.id: expected_end},
+        keep_announced=True
+    )
+    updated = _write_assignments(db, match.tournament_id, assignments, {row.id: row.scheduled_at for row in rows})
+    return {"rescheduled": updated}
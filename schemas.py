@@ -1,7 +1,8 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
-from models import UserRole, RegistrationStatus, MatchStatus, RoundType
+from models import UserRole, RegistrationStatus, MatchStatus, RoundType, TournamentFormat, SeedingMode, JobStatus
+import json
 
 
 # User Schemas
@@ -59,10 +60,24 @@ class TournamentBase(BaseModel):
     description: Optional[str] = None
     registration_fee: float
     max_participants: int
+    format: TournamentFormat = TournamentFormat.SINGLE_ELIMINATION
+    group_size: Optional[int] = None
+    swiss_rounds: Optional[int] = None
+    seeding: SeedingMode = SeedingMode.REGISTRATION
 
 
 class TournamentCreate(TournamentBase):
-    pass
+    @validator('group_size')
+    def validate_group_size(cls, v):
+        if v is not None and v < 2:
+            raise ValueError('Une poule doit contenir au moins 2 joueurs')
+        return v
+    
+    @validator('swiss_rounds')
+    def validate_swiss_rounds(cls, v):
+        if v is not None and v < 1:
+            raise ValueError('Le nombre de rondes doit être positif')
+        return v
 
 
 class TournamentResponse(TournamentBase):
@@ -93,6 +108,32 @@ class RegistrationResponse(BaseModel):
         from_attributes = True
 
 
+# Dashboard Schemas
+class UserCounts(BaseModel):
+    total: int
+    active: int
+    blocked: int
+    by_registration_status: Dict[str, int]
+
+
+class TournamentFill(BaseModel):
+    id: int
+    name: str
+    current_participants: int
+    max_participants: int
+    fill_rate: float
+    is_started: bool
+
+
+class AdminSummaryResponse(BaseModel):
+    users: UserCounts
+    registrations: Dict[str, int]
+    pending_payment_proofs: int
+    tournaments: List[TournamentFill]
+    activity: Dict[str, int]
+    generated_at: datetime
+
+
 # Match Schemas
 class MatchBase(BaseModel):
     player1_score: Optional[int] = None
@@ -106,6 +147,7 @@ class MatchResponse(BaseModel):
     round_type: RoundType
     round_number: int
     match_number: int
+    group_number: Optional[int] = None
     player1_id: Optional[int] = None
     player2_id: Optional[int] = None
     player1_score: Optional[int] = None
@@ -119,6 +161,56 @@ class MatchResponse(BaseModel):
         from_attributes = True
 
 
+# Stats Schemas
+class PlayerStatsResponse(BaseModel):
+    rank: int
+    user_id: int
+    username: str
+    full_name: str
+    profile_picture: Optional[str] = None
+    played: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+    goal_difference: int
+    titles: int
+
+
+class StandingResponse(PlayerStatsResponse):
+    points: int
+
+
+# Schedule Schemas
+class ScheduleWindow(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class ScheduleRequest(BaseModel):
+    windows: List[ScheduleWindow]
+    match_duration_minutes: int = 20
+    min_rest_minutes: int = 10
+    max_concurrent_matches: int = 4
+    
+    @validator('match_duration_minutes', 'max_concurrent_matches')
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError('La valeur doit être positive')
+        return v
+    
+    @validator('min_rest_minutes')
+    def validate_rest(cls, v):
+        if v < 0:
+            raise ValueError('Le repos minimum ne peut pas être négatif')
+        return v
+
+
+class MatchDelay(BaseModel):
+    expected_end: datetime
+
+
 # Bracket Schemas
 class BracketResponse(BaseModel):
     id: int
@@ -134,6 +226,97 @@ class BracketResponse(BaseModel):
         from_attributes = True
 
 
+# Tournament View Schemas (page des brackets)
+class PublicPlayer(BaseModel):
+    """Champs publics d'un joueur (ni email, ni téléphone, ni preuve de paiement)"""
+    id: int
+    username: str
+    full_name: str
+    profile_picture: Optional[str] = None
+
+
+class BracketSlot(BaseModel):
+    position: int
+    user_id: Optional[int] = None
+    match_id: Optional[int] = None
+
+
+class TournamentRound(BaseModel):
+    round_number: int
+    round_type: RoundType
+    slots: List[BracketSlot]
+
+
+class MatchSummary(BaseModel):
+    id: int
+    round_type: RoundType
+    round_number: int
+    match_number: int
+    group_number: Optional[int] = None
+    player1_id: Optional[int] = None
+    player2_id: Optional[int] = None
+    player1_score: Optional[int] = None
+    player2_score: Optional[int] = None
+    winner_id: Optional[int] = None
+    status: MatchStatus
+    scheduled_at: Optional[datetime] = None
+
+
+class PlayerMatch(BaseModel):
+    """Match vu par un joueur (historique, prochain match)"""
+    id: int
+    tournament_id: int
+    tournament_name: str
+    round_type: RoundType
+    round_number: int
+    match_number: int
+    group_number: Optional[int] = None
+    player1_id: Optional[int] = None
+    player2_id: Optional[int] = None
+    player1_score: Optional[int] = None
+    player2_score: Optional[int] = None
+    winner_id: Optional[int] = None
+    status: MatchStatus
+    scheduled_at: Optional[datetime] = None
+    played_at: Optional[datetime] = None
+    opponent: Optional[PublicPlayer] = None  # Absent : exempt ou adversaire pas encore qualifié
+
+
+class TournamentView(BaseModel):
+    tournament: TournamentResponse
+    rounds: List[TournamentRound]
+    matches: List[MatchSummary]
+    # Joueurs référencés par id dans rounds et matches, chacun une seule fois
+    players: Dict[int, PublicPlayer]
+    # Curseur pour /matches/changes?since=
+    cursor: int
+    # Classement final : snapshots des tournois terminés uniquement
+    standings: Optional[List[StandingResponse]] = None
+
+
+class BracketTreeResponse(BaseModel):
+    rounds: int
+    cursor: int
+    # Tas binaire : nœud 1 = finale, enfants de i en 2i et 2i+1, 0 = inconnu
+    occupants: List[int]
+    match_ids: List[int]
+
+
+class BracketPathStep(BaseModel):
+    round_number: int
+    match_number: int
+    match_id: Optional[int] = None
+    opponent_id: Optional[int] = None
+    winner_id: Optional[int] = None
+
+
+class PlayerBracketPath(BaseModel):
+    user_id: int
+    status: str  # active, eliminated, champion
+    path: List[BracketPathStep]  # Du premier tour à la finale
+    next_match: Optional[BracketPathStep] = None
+
+
 # Message Schemas
 class AdminMessageCreate(BaseModel):
     title: str
@@ -154,9 +337,52 @@ class AdminMessageResponse(BaseModel):
         from_attributes = True
 
 
+# Delta Sync Schemas (?since=<curseur>)
+class MessageChanges(BaseModel):
+    cursor: int  # À renvoyer comme since au prochain appel
+    messages: List[AdminMessageResponse]  # Créés ou modifiés depuis le curseur
+    deleted: List[int]  # Tombstones : messages désactivés depuis le curseur
+
+
+class MatchChanges(BaseModel):
+    cursor: int
+    matches: List[MatchSummary]
+    deleted: List[int]  # Matchs supprimés (tableau régénéré)
+
+
 # Token Schema
 class Token(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str
+    expires_in: int
     user: UserResponse
 
+
+class RefreshRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
+
+# Job Schemas
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    progress: float
+    progress_message: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    run_after: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    @validator('result', pre=True)
+    def parse_result(cls, v):
+        return json.loads(v) if isinstance(v, str) else v
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,136 @@
+"""
+Recherche de joueurs indexée (username, email, nom complet, téléphone)
+SQLite : table virtuelle FTS5 (tokenizer trigram) maintenue par l'application
+PostgreSQL : index GIN pg_trgm sur chaque colonne, tenus à jour par la base
+"""
+import re
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models import User
+
+SEARCH_FIELDS = ("username", "email", "full_name", "phone")
+
+# Poids bm25 par colonne (username d'abord, téléphone en dernier)
+_FTS_WEIGHTS = "10.0, 5.0, 5.0, 1.0"
+
+_PG_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS ix_users_{field}_trgm ON users USING gin ({field} gin_trgm_ops)"
+    for field in SEARCH_FIELDS
+]
+
+
+def _is_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def _is_postgres(bind) -> bool:
+    return bind.dialect.name == "postgresql"
+
+
+def ensure_search_index(engine: Engine):
+    """Créer l'index de recherche et le reconstruire s'il est désynchronisé"""
+    with engine.begin() as conn:
+        if _is_sqlite(engine):
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts "
+                "USING fts5(username, email, full_name, phone, tokenize='trigram')"
+            ))
+            indexed = conn.execute(text("SELECT count(*) FROM users_fts")).scalar()
+            users = conn.execute(text("SELECT count(*) FROM users")).scalar()
+            if indexed != users:
+                conn.execute(text("DELETE FROM users_fts"))
+                conn.execute(text(
+                    "INSERT INTO users_fts(rowid, username, email, full_name, phone) "
+                    "SELECT id, username, email, full_name, coalesce(phone, '') FROM users"
+                ))
+        elif _is_postgres(engine):
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for statement in _PG_INDEXES:
+                conn.execute(text(statement))
+
+
+def index_user(db: Session, user: User):
+    """Mettre à jour l'entrée d'index d'un utilisateur (dans la transaction en cours)"""
+    if not _is_sqlite(db.get_bind()):
+        return
+    db.execute(text("DELETE FROM users_fts WHERE rowid = :id"), {"id": user.id})
+    db.execute(
+        text(
+            "INSERT INTO users_fts(rowid, username, email, full_name, phone) "
+            "VALUES (:id, :username, :email, :full_name, :phone)"
+        ),
+        {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "full_name": user.full_name,
+            "phone": user.phone or "",
+        },
+    )
+
+
+def unindex_user(db: Session, user_id: int):
+    """Retirer un utilisateur de l'index"""
+    if _is_sqlite(db.get_bind()):
+        db.execute(text("DELETE FROM users_fts WHERE rowid = :id"), {"id": user_id})
+
+
+def _fts_query(query: str) -> str:
+    """Transformer la saisie en requête FTS5 : tous les trigrammes, combinés par OR"""
+    normalized = re.sub(r"\s+", " ", query.lower()).strip()
+    grams = {normalized[i:i + 3] for i in range(len(normalized) - 2)}
+    return " OR ".join('"' + gram.replace('"', '""') + '"' for gram in sorted(grams))
+
+
+def _search_ids(db: Session, query: str, limit: int) -> List[int]:
+    bind = db.get_bind()
+    query = query.strip()
+
+    if _is_sqlite(bind) and len(query) >= 3:
+        # Un trigramme commun suffit à remonter un résultat : tolère fautes et préfixes,
+        # bm25 classe en premier les entrées qui partagent le plus de trigrammes
+        rows = db.execute(
+            text(
+                f"SELECT rowid FROM users_fts WHERE users_fts MATCH :match "
+                f"ORDER BY bm25(users_fts, {_FTS_WEIGHTS}) LIMIT :limit"
+            ),
+            {"match": _fts_query(query), "limit": limit},
+        )
+        return [row[0] for row in rows]
+
+    if _is_postgres(bind):
+        rows = db.execute(
+            text(
+                "SELECT id FROM users "
+                "WHERE username ILIKE :pattern OR email ILIKE :pattern "
+                "OR full_name ILIKE :pattern OR phone ILIKE :pattern "
+                "OR username % :q OR email % :q OR full_name % :q "
+                "ORDER BY (username ILIKE :prefix) DESC, greatest("
+                "similarity(username, :q), similarity(email, :q), "
+                "similarity(full_name, :q), similarity(coalesce(phone, ''), :q)) DESC "
+                "LIMIT :limit"
+            ),
+            {"q": query, "pattern": f"%{query}%", "prefix": f"{query}%", "limit": limit},
+        )
+        return [row[0] for row in rows]
+
+    # Requêtes trop courtes pour les trigrammes : préfixe simple
+    prefix = f"{query}%"
+    rows = db.query(User.id).filter(
+        User.username.ilike(prefix) | User.email.ilike(prefix)
+        | User.full_name.ilike(prefix) | User.phone.ilike(prefix)
+    ).order_by(User.username).limit(limit)
+    return [row[0] for row in rows]
+
+
+def search_users(db: Session, query: str, limit: int = 20) -> List[User]:
+    """Rechercher des joueurs, résultats classés par pertinence"""
+    ids = _search_ids(db, query, limit)
+    if not ids:
+        return []
+    users = {user.id: user for user in db.query(User).filter(User.id.in_(ids)).all()}
+    return [users[user_id] for user_id in ids if user_id in users]
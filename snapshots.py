@@ -0,0 +1,61 @@
+"""
+Snapshots figés des tournois terminés
+Un tournoi terminé (end_date renseignée) ne change plus : sa vue complète
+(tournoi, rondes, matchs, joueurs, classement final) est rendue une fois par
+un job dans un fichier JSON précompressé (gzip), écrit de façon atomique.
+/view sert ensuite ce fichier tel quel, avant toute requête SQL, avec un
+cache navigateur d'un an (immutable) et un ETag tiré du contenu. Le tournoi
+est figé par end_date, pas par la présence du fichier : un redéploiement sans
+disque persistant efface le snapshot, et /view reconstruit alors la vue.
+Les lignes Bracket détaillées ne sont supprimées que si le dossier est
+déclaré persistant (TOURNAMENT_SNAPSHOT_DURABLE)
+"""
+import gzip
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Request, Response
+
+from config import settings
+
+
+def snapshot_path(tournament_id: int) -> str:
+    return os.path.join(settings.TOURNAMENT_SNAPSHOT_DIR, f"tournament_{tournament_id}.json.gz")
+
+
+def write_snapshot(tournament_id: int, body: bytes) -> dict:
+    """Écrire le snapshot compressé (fichier temporaire puis renommage : jamais de fichier partiel servi)"""
+    os.makedirs(settings.TOURNAMENT_SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(tournament_id)
+    # mtime=0 : mêmes octets pour le même contenu si le job est rejoué
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(compressed)
+    os.replace(tmp_path, path)
+    return {"path": path, "size": len(body), "compressed_size": len(compressed)}
+
+
+def snapshot_response(request: Request, tournament_id: int) -> Optional[Response]:
+    """Réponse servie depuis le snapshot du tournoi ; None s'il n'a pas été figé"""
+    try:
+        with open(snapshot_path(tournament_id), "rb") as f:
+            compressed = f.read()
+    except FileNotFoundError:
+        return None
+
+    # Empreinte du contenu : stable si le fichier est réécrit ou redéployé à l'identique
+    etag = f'"{hashlib.sha256(compressed).hexdigest()[:32]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.TOURNAMENT_SNAPSHOT_CACHE_MAX_AGE}, immutable",
+        "Vary": "Accept-Encoding",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=compressed, media_type="application/json", headers=headers)
+    return Response(content=gzip.decompress(compressed), media_type="application/json", headers=headers)
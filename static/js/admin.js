@@ -9,8 +9,50 @@ document.addEventListener('DOMContentLoaded', async () => {
         window.location.href = '/';
         return;
     }
+    loadDashboard();
 });
 
+// Tableau de bord : compteurs agrégés côté serveur en une requête
+async function loadDashboard() {
+    try {
+        const token = localStorage.getItem('token');
+        const response = await fetch('/api/admin/summary', {
+            headers: {
+                'Authorization': `Bearer ${token}`
+            }
+        });
+        
+        const summary = await response.json();
+        const container = document.getElementById('dashboardSummary');
+        
+        container.innerHTML = `
+            <p>
+                Utilisateurs : ${summary.users.total}
+                (actifs ${summary.users.active}, bloqués ${summary.users.blocked}) —
+                en attente ${summary.users.by_registration_status.pending},
+                approuvés ${summary.users.by_registration_status.approved},
+                refusés ${summary.users.by_registration_status.rejected}
+            </p>
+            <p>
+                Inscriptions tournois en attente : ${summary.registrations.pending} —
+                preuves de paiement à vérifier : ${summary.pending_payment_proofs}
+            </p>
+            <p>
+                Activité : ${summary.activity.last_hour} (1h),
+                ${summary.activity.last_24h} (24h), ${summary.activity.last_7d} (7j)
+            </p>
+            <ul>
+                ${summary.tournaments.map(t => `
+                    <li>${t.name} : ${t.current_participants}/${t.max_participants}
+                        (${Math.round(t.fill_rate * 100)}%)${t.is_started ? ' — démarré' : ''}</li>
+                `).join('')}
+            </ul>
+        `;
+    } catch (error) {
+        console.error('Erreur de chargement du tableau de bord:', error);
+    }
+}
+
 // Gestion des sections
 function loadSection(section) {
     // Cacher toutes les sections
@@ -229,7 +271,7 @@ async function loadRegistrations() {
                 </td>
                 <td>${new Date(reg.created_at).toLocaleDateString('fr-FR')}</td>
                 <td>
-                    ${reg.payment_proof ? `<a href="/static/uploads/${reg.payment_proof}" target="_blank">Voir preuve</a>` : 'Aucune preuve'}
+                    ${reg.payment_proof ? `<a href="/api/uploads/${reg.payment_proof}" target="_blank">Voir preuve</a>` : 'Aucune preuve'}
                 </td>
             </tr>
         `).join('');
@@ -272,15 +314,40 @@ async function startTournament(tournamentId) {
             }
         });
         
+        const data = await response.json();
         if (response.ok) {
-            showAlert('Tournoi démarré avec succès!', 'success');
-            loadTournamentsAdmin();
+            showAlert('Démarrage du tournoi en cours...', 'success');
+            waitForJob(data.job_id, () => {
+                showAlert('Tournoi démarré avec succès!', 'success');
+                loadTournamentsAdmin();
+            });
+        } else {
+            showAlert(data.detail || 'Erreur', 'error');
         }
     } catch (error) {
         showAlert('Erreur', 'error');
     }
 }
 
+// Suivre un job en arrière-plan jusqu'à sa fin
+async function waitForJob(jobId, onSuccess) {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`/api/admin/jobs/${jobId}`, {
+        headers: {
+            'Authorization': `Bearer ${token}`
+        }
+    });
+    const job = await response.json();
+    
+    if (job.status === 'succeeded') {
+        onSuccess(job);
+    } else if (job.status === 'failed') {
+        showAlert(job.error || 'Échec du job', 'error');
+    } else {
+        setTimeout(() => waitForJob(jobId, onSuccess), 1000);
+    }
+}
+
 // Gestion des messages
 async function loadMessagesAdmin() {
     try {
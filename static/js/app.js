@@ -4,10 +4,47 @@ const API_BASE_URL = '/api';
 // Gestion de l'authentification
 let currentUser = null;
 
+// Les access tokens sont de courte durée : sur un 401, on les renouvelle
+// une fois via le refresh token (cookie httponly) puis on rejoue la requête
+const nativeFetch = window.fetch.bind(window);
+let refreshPromise = null;
+
+function refreshAccessToken() {
+    if (!refreshPromise) {
+        refreshPromise = nativeFetch(`${API_BASE_URL}/users/refresh`, { method: 'POST' })
+            .then(async response => {
+                if (!response.ok) return null;
+                const data = await response.json();
+                localStorage.setItem('token', data.access_token);
+                return data.access_token;
+            })
+            .catch(() => null)
+            .finally(() => { refreshPromise = null; });
+    }
+    return refreshPromise;
+}
+
+window.fetch = async (input, init = {}) => {
+    const response = await nativeFetch(input, init);
+    const headers = new Headers(init.headers || {});
+    if (response.status !== 401 || !headers.has('Authorization')) {
+        return response;
+    }
+    const token = await refreshAccessToken();
+    if (!token) {
+        return response;
+    }
+    headers.set('Authorization', `Bearer ${token}`);
+    return nativeFetch(input, { ...init, headers });
+};
+
 // Vérifier si l'utilisateur est connecté au chargement
 document.addEventListener('DOMContentLoaded', async () => {
     await checkAuth();
     loadMessages();
+    if (document.getElementById('messagesContainer')) {
+        setInterval(loadMessages, MESSAGES_POLL_INTERVAL);
+    }
     if (window.location.pathname === '/' || window.location.pathname === '/index.html') {
         loadTournaments();
     }
@@ -135,8 +172,10 @@ async function register(userData) {
 
 async function logout() {
     try {
+        const token = localStorage.getItem('token');
         await fetch(`${API_BASE_URL}/users/logout`, {
-            method: 'POST'
+            method: 'POST',
+            headers: token ? { 'Authorization': `Bearer ${token}` } : {}
         });
     } catch (error) {
         console.error('Erreur de déconnexion:', error);
@@ -265,16 +304,27 @@ async function registerToTournament(tournamentId) {
     }
 }
 
-// Charger les messages
+// Charger les messages (synchronisation incrémentale : seuls les changements transitent)
+const MESSAGES_POLL_INTERVAL = 30000;
+let messagesCursor = 0;
+const messagesById = new Map();
+
 async function loadMessages() {
     try {
-        const response = await fetch(`${API_BASE_URL}/messages/`);
-        const messages = await response.json();
+        const response = await fetch(`${API_BASE_URL}/messages/changes?since=${messagesCursor}`);
+        const changes = await response.json();
+        
+        changes.messages.forEach(msg => messagesById.set(msg.id, msg));
+        changes.deleted.forEach(id => messagesById.delete(id));
+        const changed = messagesCursor === 0 || changes.messages.length > 0 || changes.deleted.length > 0;
+        messagesCursor = changes.cursor;
         
         const container = document.getElementById('messagesContainer');
-        if (!container) return;
+        if (!container || !changed) return;
         
-        if (messages.length === 0) return;
+        const messages = [...messagesById.values()].sort((a, b) =>
+            (b.is_important - a.is_important) || (new Date(b.created_at) - new Date(a.created_at))
+        );
         
         container.innerHTML = messages.map(msg => `
             <div class="message-card ${msg.is_important ? 'important' : ''}">
@@ -356,7 +406,7 @@ function showProfileModal() {
         
         const img = document.getElementById('currentProfilePicture');
         if (currentUser.profile_picture) {
-            img.src = `/static/uploads/${currentUser.profile_picture}`;
+            img.src = `/api/uploads/${currentUser.profile_picture}`;
         } else {
             img.src = '/static/default-avatar.png';
         }
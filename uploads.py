@@ -0,0 +1,200 @@
+"""
+Service des fichiers uploadés (photos de profil, preuves de paiement)
+Les fichiers sont nommés d'après le hash de leur contenu : une URL ne change
+jamais de contenu, d'où un cache long et immuable. La réponse gère les
+requêtes conditionnelles (ETag, If-Modified-Since), une plage Range, l'envoi
+zéro-copie quand le serveur ASGI le propose (extensions zerocopysend/pathsend)
+et peut déléguer le transfert au proxy (X-Accel-Redirect)
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+from config import settings
+
+UPLOAD_KINDS = ("profiles", "payments")
+CHUNK_SIZE = 256 * 1024
+
+# profile_12_<16 hex>.jpg : nom dérivé du contenu
+_HASHED_NAME = re.compile(r"_([0-9a-f]{16})\.[A-Za-z0-9]+$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def content_hashed_filename(prefix: str, user_id: int, contents: bytes, extension: str) -> str:
+    """Nom de fichier immuable : le même contenu donne toujours le même nom"""
+    digest = hashlib.sha256(contents).hexdigest()[:16]
+    return f"{prefix}_{user_id}_{digest}{extension.lower()}"
+
+
+def resolve_upload(kind: str, filename: str) -> Optional[str]:
+    """Chemin absolu d'un fichier uploadé, ou None (type inconnu, traversée, absent)"""
+    if kind not in UPLOAD_KINDS or "/" in filename or "\\" in filename or filename.startswith("."):
+        return None
+    directory = os.path.realpath(os.path.join(settings.UPLOAD_DIR, kind))
+    path = os.path.realpath(os.path.join(directory, filename))
+    if os.path.dirname(path) != directory or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """Plage unique "bytes=a-b" -> (début, fin incluse) ; None si non gérée (réponse complète)"""
+    match = _RANGE.match(value.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        return (max(size - length, 0), size - 1) if length else (size, size - 1)
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+class UploadFileResponse(Response):
+    """Réponse ASGI pour un fichier uploadé"""
+
+    def __init__(self, path: str, relative_path: str, public: bool):
+        self.path = path
+        self.relative_path = relative_path
+        self.public = public
+        self.status_code = 200
+        self.background = None
+        self.raw_headers = []  # En-têtes ajoutés par FastAPI (dépendances)
+
+    async def _start(self, send, status: int, headers: list):
+        await send({"type": "http.response.start", "status": status, "headers": headers + self.raw_headers})
+
+    def _cache_headers(self, stat_result) -> list:
+        name = os.path.basename(self.path)
+        hashed = _HASHED_NAME.search(name)
+        etag = f'"{hashed.group(1)}"' if hashed else f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        visibility = "public" if self.public else "private"
+        if hashed:
+            cache_control = f"{visibility}, max-age={settings.UPLOAD_CACHE_MAX_AGE}, immutable"
+        else:
+            cache_control = f"{visibility}, no-cache"
+        return [
+            (b"etag", etag.encode()),
+            (b"last-modified", formatdate(stat_result.st_mtime, usegmt=True).encode()),
+            (b"cache-control", cache_control.encode()),
+            (b"accept-ranges", b"bytes"),
+        ]
+
+    @staticmethod
+    def _not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            # Comparaison faible : W/"x" vaut "x" (str.removeprefix n'existe qu'à partir de Python 3.9)
+            tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+            return "*" in tags or etag in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    async def __call__(self, scope, receive, send):
+        await self._send(scope, send)
+        if self.background is not None:
+            await self.background()
+
+    async def _send(self, scope, send):
+        request_headers = Headers(scope=scope)
+        stat_result = await run_in_threadpool(os.stat, self.path)
+        size = stat_result.st_size
+        headers = self._cache_headers(stat_result)
+        etag = headers[0][1].decode()
+
+        if self._not_modified(request_headers, etag, stat_result.st_mtime):
+            await self._start(send, 304, headers)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        content_type = mimetypes.guess_type(self.path)[0] or "application/octet-stream"
+        headers.append((b"content-type", content_type.encode()))
+
+        # Transfert délégué au proxy (nginx : location internal sur le dossier d'upload)
+        if settings.UPLOAD_ACCEL_REDIRECT_PREFIX:
+            target = settings.UPLOAD_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + self.relative_path
+            headers.append((b"x-accel-redirect", target.encode()))
+            await self._start(send, 200, headers)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        status = 200
+        start, end = 0, size - 1
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (if_range is None or if_range.strip() == etag):
+            requested = _parse_range(range_header, size)
+            if requested is not None:
+                start, end = requested
+                if start > end or start >= size:
+                    headers.append((b"content-range", f"bytes */{size}".encode()))
+                    await self._start(send, 416, headers)
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+                status = 206
+                headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+
+        length = end - start + 1 if size else 0
+        headers.append((b"content-length", str(length).encode()))
+        await self._start(send, status, headers)
+
+        if scope["method"] == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as file:
+                await send({"type": "http.response.zerocopysend", "file": file, "offset": start, "count": length})
+            return
+        if "http.response.pathsend" in extensions and status == 200:
+            await send({"type": "http.response.pathsend", "path": self.path})
+            return
+
+        # Repli : lectures par blocs hors de la boucle d'événements, via un objet fichier
+        # (os.pread n'existe pas sous Windows)
+        file = await run_in_threadpool(open, self.path, "rb")
+        try:
+            await run_in_threadpool(file.seek, start)
+            remaining = length
+            while remaining > 0:
+                chunk = await run_in_threadpool(file.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            await run_in_threadpool(file.close)
+
+
+class PublicStaticFiles(StaticFiles):
+    """/static sans le dossier d'upload (servi par /api/uploads, avec contrôle d'accès)"""
+
+    def __init__(self, *args, hidden_dir: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hidden_dir = os.path.realpath(hidden_dir) if hidden_dir else None
+
+    def lookup_path(self, path: str):
+        full_path, stat_result = super().lookup_path(path)
+        if self.hidden_dir and full_path and (
+            os.path.realpath(full_path) + os.sep
+        ).startswith(self.hidden_dir + os.sep):
+            return "", None
+        return full_path, stat_result